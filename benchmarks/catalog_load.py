@@ -0,0 +1,175 @@
+"""Compare the async and sync catalog read paths under concurrent load.
+
+    python -m benchmarks.catalog_load --rows 20000 --concurrency 200 --requests 5000
+
+Seeds a fresh SQLite catalog, then starts the app under uvicorn twice,
+with DVA_ASYNC_DB=true and DVA_ASYNC_DB=false, and fires the same mix of
+list pages, item reads and searches at each with ``--concurrency``
+requests in flight. The response cache is off (DVA_CATALOG_CACHE_MB=0) so
+every request reaches the database. Prints requests/sec and p50/p99
+latency per mode.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Descriptions draw from this many distinct words, so a search hits ~0.3% of the catalog.
+VOCABULARY = 20000
+WORDS = ["injection", "cross", "scripting", "disclosure", "header", "cookie", "session", "traversal", "redirect", "tls"]
+
+
+def seed_catalog(rows, seed=0):
+    from sqlalchemy import insert
+    from webapp import models
+    from webapp.database import engine, init_db
+
+    rnd = random.Random(seed)
+    init_db()
+    entries = [
+        {
+            "title": f"{rnd.choice(WORDS).title()} {rnd.choice(WORDS)} finding {i}",
+            "severity": ("Critical", "High", "Medium", "Low")[i % 4],
+            "cvss_score": "",
+            "cvss_vector": "",
+            "description": " ".join(f"term{rnd.randrange(VOCABULARY)}" for _ in range(60)),
+            "evidence": "",
+            "recommendation": "Fix it.",
+            "reference": "https://example.com",
+        }
+        for i in range(rows)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Vulnerability), entries)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request_mix(rows, count, seed=0):
+    rnd = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        kind = rnd.random()
+        if kind < 0.4:
+            paths.append(f"/vulnerabilities/?limit=50&sort=title&fields=id,title,severity&severity={rnd.choice(['High', 'Low'])}")
+        elif kind < 0.8:
+            paths.append(f"/vulnerabilities/{rnd.randint(1, rows)}")
+        else:
+            paths.append(f"/vulnerabilities/search?q=term{rnd.randrange(VOCABULARY)}&limit=20")
+    return paths
+
+
+async def _load(base_url, paths, concurrency):
+    import httpx
+
+    latencies, errors = [], {}
+    queue = iter(paths)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            for path in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    error = type(e).__name__
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+                latencies.append(time.perf_counter() - started)
+
+        # Warm the connection pools of both client and server first.
+        await asyncio.gather(*(client.get("/health") for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def run_mode(args, mode, workdir, paths):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DVA_ASYNC_DB=mode,
+        DVA_CATALOG_CACHE_MB="0",
+        DVA_WARMUP="off",
+        DVA_DATABASE_URL="sqlite:///./dva.db",
+    )
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "webapp.main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log"],
+        cwd=workdir, env=env,
+    )
+    try:
+        import httpx
+
+        deadline = time.time() + 30
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError(f"uvicorn did not start (DVA_ASYNC_DB={mode})")
+                time.sleep(0.2)
+        return asyncio.run(_load(f"http://127.0.0.1:{port}", paths, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare async and sync catalog reads under load.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workdir")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dva-load-")
+    os.makedirs(os.path.join(workdir, "uploaded_evidence"), exist_ok=True)
+    os.chdir(workdir)
+    for name in ("dva.db", "dva.db-wal", "dva.db-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+    print(f"Working directory: {workdir}")
+
+    started = time.perf_counter()
+    os.environ.setdefault("DVA_DATABASE_URL", "sqlite:///./dva.db")
+    seed_catalog(args.rows)
+    print(f"Seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    paths = _request_mix(args.rows, args.requests)
+    for mode, label in (("true", "async"), ("false", "sync")):
+        result = run_mode(args, mode, workdir, paths)
+        print(
+            f"  {label:<5} {result['requests']} requests, {args.concurrency} in flight: "
+            f"{result['rps']:.0f} req/s  p50 {result['p50_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms  "
+            f"errors {sum(result['errors'].values())}"
+            + (f" {result['errors']}" if result["errors"] else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Check that catalog reads keep flowing while a bulk write is in progress.
+
+    python -m benchmarks.db_concurrency --rows 20000 --readers 4 --max-read-ms 250
+
+Seeds a fresh SQLite catalog, then holds one long write transaction (a
+bulk insert in chunks, committed at the end, like a large Excel import)
+while reader threads page through the catalog. Fails if any read errors
+or takes longer than ``--max-read-ms`` in the configured journal mode
+(WAL). ``--compare`` also runs the old rollback journal for contrast.
+Each mode runs in its own interpreter and work directory, because the
+pragmas are applied when webapp.database creates the engine.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _entry(i, prefix):
+    return {
+        "title": f"{prefix} entry {i}",
+        "severity": ("Critical", "High", "Medium", "Low")[i % 4],
+        "cvss_score": "",
+        "cvss_vector": "",
+        "description": f"Description of {prefix.lower()} entry {i}. " * 20,
+        "evidence": "",
+        "recommendation": "Fix it.",
+        "reference": "https://example.com",
+    }
+
+
+def run_mode(args):
+    """Runs inside the child interpreter; prints one JSON line."""
+    from sqlalchemy import insert, select, text
+    from webapp import crud, models
+    from webapp.database import SessionLocal, engine, init_db
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Vulnerability), [_entry(i, "Seed") for i in range(args.seed_rows)])
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+
+    writing = threading.Event()
+    done = threading.Event()
+    write_stats = {}
+
+    def writer():
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            chunk = 1000
+            for start in range(0, args.rows, chunk):
+                db.execute(insert(models.Vulnerability), [
+                    _entry(i, "Bulk") for i in range(start, min(start + chunk, args.rows))
+                ])
+                writing.set()
+                # Spread the transaction out so readers overlap with it.
+                time.sleep(args.write_pause)
+            crud.bump_catalog_version(db)
+            db.commit()
+            write_stats["seconds"] = time.perf_counter() - started
+        except Exception as e:
+            write_stats["error"] = f"{type(e).__name__}: {e}"
+            db.rollback()
+        finally:
+            db.close()
+            done.set()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def reader():
+        writing.wait()
+        while not done.is_set():
+            db = SessionLocal()
+            started = time.perf_counter()
+            try:
+                crud.get_catalog_version(db)
+                rows, _ = crud.list_vulnerabilities(db, fields=["id", "title", "severity"], sort="title", limit=50)
+                db.execute(select(models.Vulnerability.id).limit(1)).all()
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}".splitlines()[0])
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    result = {
+        "journal_mode": journal_mode,
+        "write_seconds": round(write_stats.get("seconds", 0), 2),
+        "write_error": write_stats.get("error"),
+        "reads": len(latencies),
+        "read_errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+    }
+    print(json.dumps(result))
+
+
+def run_mode_subprocess(args, journal_mode, workdir):
+    os.makedirs(workdir, exist_ok=True)
+    env = dict(os.environ, DVA_DATABASE_URL="sqlite:///./dva.db", DVA_SQLITE_JOURNAL_MODE=journal_mode,
+               DVA_SQLITE_BUSY_TIMEOUT=str(args.busy_timeout))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+    command = [
+        sys.executable, "-m", "benchmarks.db_concurrency", "--run-mode",
+        "--rows", str(args.rows), "--seed-rows", str(args.seed_rows),
+        "--readers", str(args.readers), "--write-pause", str(args.write_pause),
+    ]
+    proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"journal_mode": journal_mode, "error": proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that catalog reads keep flowing during a bulk write.")
+    parser.add_argument("--rows", type=int, default=20000, help="rows inserted by the bulk write")
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--write-pause", type=float, default=0.05, help="seconds between write chunks")
+    parser.add_argument("--busy-timeout", type=float, default=5.0, help="SQLite busy timeout in seconds")
+    parser.add_argument("--max-read-ms", type=float, default=250.0)
+    parser.add_argument("--compare", action="store_true", help="also run with the rollback journal (DELETE)")
+    parser.add_argument("--workdir")
+    parser.add_argument("--run-mode", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_mode:
+        run_mode(args)
+        return 0
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dva-dbcheck-")
+    print(f"Working directory: {workdir}")
+    modes = [os.environ.get("DVA_SQLITE_JOURNAL_MODE", "WAL")] + (["DELETE"] if args.compare else [])
+    results = {}
+    for mode in modes:
+        result = run_mode_subprocess(args, mode, os.path.join(workdir, mode.lower()))
+        results[mode] = result
+        if result.get("error"):
+            print(f"  {mode:<7} ERROR {result['error']}")
+            continue
+        print(
+            f"  {result['journal_mode']:<7} write {result['write_seconds']:.1f}s"
+            f"{' (failed: ' + result['write_error'] + ')' if result['write_error'] else ''}  "
+            f"reads {result['reads']:>5}  errors {result['read_errors']}  "
+            f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  max {result['max_ms']} ms"
+            + (f"  first error: {result['first_error']}" if result["first_error"] else "")
+        )
+
+    checked = results[modes[0]]
+    if checked.get("error") or checked["write_error"] or checked["read_errors"] or not checked["reads"] \
+            or checked["max_ms"] > args.max_read_ms:
+        print(f"❌ Reads were blocked or failed during the bulk write ({modes[0]})")
+        return 1
+    print(f"✅ Reads kept flowing during the bulk write ({modes[0]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Benchmark the Excel catalog import.
+
+    python -m benchmarks.import_bench --rows 50000 --existing 0.5
+
+Writes a synthetic .xlsx sheet, seeds a fresh SQLite catalog in the work
+directory with ``--existing`` of its titles (a third of those with changed
+text, in different letter case), then imports the sheet twice: the first
+run inserts and updates, the second should find everything unchanged.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+
+
+def write_sheet(path, rows, seed=0):
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["title", "severity", "cvss_score", "description", "recommendation", "reference"])
+    for i in range(rows):
+        sheet.append([
+            f"Synthetic catalog entry {i}",
+            SEVERITIES[i % 4],
+            round(rnd.uniform(0, 10), 1),
+            f"Description of entry {i}. " * 8,
+            f"Recommendation for entry {i}.",
+            f"https://example.com/kb/{i}",
+        ])
+    # A few rows the import must report instead of writing.
+    sheet.append(["", "High", None, "no title", "", ""])
+    sheet.append(["Synthetic catalog entry 0", "Low", None, "duplicate", "", ""])
+    workbook.save(path)
+
+
+def seed_catalog(rows, existing, seed=0):
+    from webapp import models
+    from webapp.database import engine, init_db
+
+    rnd = random.Random(seed)
+    # Also creates the search index, so the timings include the FTS triggers like in production.
+    init_db()
+    entries = []
+    for i in rnd.sample(range(rows), int(rows * existing)):
+        changed = i % 3 == 0
+        entries.append({
+            "title": f"SYNTHETIC CATALOG ENTRY {i}",
+            "severity": SEVERITIES[i % 4],
+            "cvss_score": "",
+            "cvss_vector": "",
+            "description": "stale" if changed else f"Description of entry {i}. " * 8,
+            "evidence": "",
+            "recommendation": f"Recommendation for entry {i}.",
+            "reference": f"https://example.com/kb/{i}",
+        })
+    with engine.begin() as conn:
+        if entries:
+            conn.execute(models.Vulnerability.__table__.insert(), entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Excel catalog import.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--existing", type=float, default=0.5, help="fraction of titles already in the catalog")
+    parser.add_argument("--workdir")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dva-import-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    for name in ("dva.db", "dva.db-wal", "dva.db-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+    print(f"Working directory: {workdir}")
+
+    started = time.perf_counter()
+    write_sheet("catalog.xlsx", args.rows)
+    seed_catalog(args.rows, args.existing)
+    print(f"Prepared {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    from webapp.catalog_import import import_catalog
+    from webapp.database import SessionLocal
+
+    for label in ("first import", "re-import"):
+        db = SessionLocal()
+        try:
+            with open("catalog.xlsx", "rb") as f:
+                result = import_catalog(db, f)
+        finally:
+            db.close()
+        stats = result["stats"]
+        print(
+            f"  {label:<12} inserted {result['inserted']:>6}  updated {result['updated']:>6}  "
+            f"unchanged {result['unchanged']:>6}  invalid {result['invalid']}  failed {result['failed']}  "
+            f"{stats['seconds']:.2f}s ({stats['rows_per_second']} rows/s, index {stats['index_seconds']:.2f}s, "
+            f"write {stats['write_seconds']:.2f}s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
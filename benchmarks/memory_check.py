@@ -0,0 +1,72 @@
+"""Check that bounded-memory report generation keeps peak RSS flat.
+
+    python -m benchmarks.memory_check --findings 50,100,200,400 --max-growth-mb 32
+
+Renders DOCX reports of growing size in bounded-memory mode (every
+screenshot unique, so nothing is de-duplicated) and fails if peak RSS of
+the largest report exceeds the smallest by more than ``--max-growth-mb``.
+Reports are written to a file so the finished .docx isn't counted. The
+image and fragment caches keep their configured sizes, so the check covers
+what a default deployment does. ``--unbounded`` adds the normal mode for
+contrast. A small version of this check runs with
+``python -m pytest --run-slow tests/test_memory.py``.
+"""
+import argparse
+import sys
+import tempfile
+
+from benchmarks.report_bench import run_case_subprocess
+from benchmarks.synthetic import generate_screenshots
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that bounded report generation has flat memory use.")
+    parser.add_argument("--findings", default="50,100,200,400")
+    parser.add_argument("--steps", type=int, default=2)
+    parser.add_argument("--resolution", default="1024x768")
+    parser.add_argument("--format", default="png", choices=["png", "jpeg", "bmp"])
+    parser.add_argument("--max-growth-mb", type=float, default=32.0)
+    parser.add_argument("--unbounded", action="store_true", help="also measure the normal (in-memory) mode")
+    parser.add_argument("--workdir")
+    args = parser.parse_args(argv)
+
+    counts = sorted(int(n) for n in args.findings.split(","))
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dva-memcheck-")
+    print(f"Generating {counts[-1] * args.steps} screenshots in {workdir}...")
+    screenshots = generate_screenshots(
+        f"{workdir}/uploaded_evidence", counts[-1] * args.steps, width, height, args.format
+    )
+
+    peaks = {}
+    for bounded in ([True, False] if args.unbounded else [True]):
+        mode = "bounded" if bounded else "unbounded"
+        for findings in counts:
+            case = {
+                "renderer": "docx", "findings": findings, "steps": args.steps,
+                "resolution": args.resolution, "format": args.format, "bounded": bounded,
+                "to_file": True, "screenshots": screenshots[:findings * args.steps], "repeat": 1,
+            }
+            result = run_case_subprocess(case, workdir)
+            iteration = result["iterations"][0]
+            if iteration.get("error"):
+                print(f"  {mode:<9} {findings:>5} findings: ERROR {iteration['error']}")
+                return 1
+            peaks[(mode, findings)] = result["peak_rss_mb"]
+            print(
+                f"  {mode:<9} {findings:>5} findings: peak rss {result['peak_rss_mb']:>7.1f} MB  "
+                f"{iteration['wall_s']:.1f}s  out {iteration['output_bytes'] / 1e6:.1f} MB"
+            )
+
+    growth = peaks[("bounded", counts[-1])] - peaks[("bounded", counts[0])]
+    print(f"Bounded peak RSS growth {counts[0]} -> {counts[-1]} findings: {growth:.1f} MB "
+          f"(limit {args.max_growth_mb} MB)")
+    if growth > args.max_growth_mb:
+        print("❌ Memory is not flat")
+        return 1
+    print("✅ Memory is flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Report generation benchmark.
+
+    python -m benchmarks.report_bench --findings 10,100,1000 --steps 2 \\
+        --resolution 1920x1080 --format png -o bench.json
+    python -m benchmarks.report_bench ... --compare previous.json
+
+Every (renderer, finding count) case runs in a fresh interpreter so peak RSS
+and cold-cache timings are per case. Each case renders ``--repeat`` times
+through the report routers' rendering code and records wall time, the
+webapp.timing stage timers, peak RSS and output size. Results are written
+as JSON; ``--compare`` prints the change against an earlier run (total and
+per stage) and exits non-zero on regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MIN_STAGE_SECONDS = 0.1
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _render_docx(payload, to_file=False):
+    from io import BytesIO
+    from webapp.routers.report import ReportRequest, render_report
+    from webapp.timing import StageTimer
+
+    timer = StageTimer()
+    timer.mark("validate")
+    request = ReportRequest(**payload)
+    if to_file:
+        # Keeps the finished .docx out of the measured process memory.
+        render_report(request, "bench_report.docx", timer=timer)
+        return os.path.getsize("bench_report.docx"), timer.as_dict()
+    output = render_report(request, BytesIO(), timer=timer)
+    return len(output.getvalue()), timer.as_dict()
+
+
+def _render_pdf(payload, to_file=False):
+    from webapp.pdf_engine import build_report_html, pdf_renderer
+    from webapp.routers.pdf_report import PDFReportRequest
+    from webapp.timing import StageTimer
+
+    timer = StageTimer("pdf_report")
+    timer.mark("validate")
+    request = PDFReportRequest(**payload)
+    html = build_report_html(request, timer)
+    timer.mark("pdf")
+    pdf = pdf_renderer.render(html)
+    return len(pdf), timer.stop().as_dict()
+
+
+RENDERERS = {"docx": _render_docx, "pdf": _render_pdf}
+
+
+def run_case(case):
+    """Run one benchmark case in this process (cwd is the bench workdir)."""
+    sys.path.insert(0, REPO_ROOT)
+    from benchmarks.synthetic import synthetic_payload
+
+    payload = synthetic_payload(case["findings"], case["steps"], case["screenshots"])
+    if case.get("bounded") is not None:
+        payload["bounded_memory"] = case["bounded"]
+    render = RENDERERS[case["renderer"]]
+    iterations = []
+    for _ in range(case["repeat"]):
+        start = time.perf_counter()
+        try:
+            size, timing = render(payload, case.get("to_file", False))
+            error = None
+        except Exception as e:
+            message = str(e).splitlines()[0] if str(e) else ""
+            size, timing, error = None, {}, f"{type(e).__name__}: {message}"
+        iterations.append({
+            "wall_s": round(time.perf_counter() - start, 4),
+            "timing": timing,
+            "output_bytes": size,
+            "error": error,
+        })
+        if error:
+            break
+    return dict(
+        {k: case.get(k) for k in ("renderer", "findings", "steps", "resolution", "format", "bounded")},
+        iterations=iterations,
+        peak_rss_mb=_peak_rss_mb(),
+    )
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_case_subprocess(case, workdir, env=None):
+    """Run ``case`` in a fresh interpreter with cwd ``workdir``; return its result."""
+    env = dict(os.environ, **(env or {}))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.report_bench", "--run-case", json.dumps(case)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        result = dict(case, iterations=[{"error": proc.stderr.strip().splitlines()[-1]}])
+        result.pop("screenshots")
+        return result
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_matrix(args):
+    from benchmarks.synthetic import generate_screenshots
+
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dva-bench-")
+    print(f"Working directory: {workdir}")
+    screenshots = generate_screenshots(
+        os.path.join(workdir, "uploaded_evidence"), args.unique_images, width, height, args.format
+    )
+
+    results = []
+    for renderer in args.renderers.split(","):
+        for findings in (int(n) for n in args.findings.split(",")):
+            case = {
+                "renderer": renderer, "findings": findings, "steps": args.steps,
+                "resolution": args.resolution, "format": args.format,
+                "screenshots": screenshots, "repeat": args.repeat,
+            }
+            result = run_case_subprocess(case, workdir)
+            results.append(result)
+            first = result["iterations"][0]
+            if first.get("error"):
+                print(f"  {renderer:<5} {findings:>5} findings: ERROR {first['error']}")
+            else:
+                walls = ", ".join(f"{it['wall_s']:.2f}s" for it in result["iterations"])
+                print(
+                    f"  {renderer:<5} {findings:>5} findings: {walls}  "
+                    f"rss {result['peak_rss_mb']} MB  out {first['output_bytes'] / 1e6:.1f} MB"
+                )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("run_case", "compare", "output")},
+        },
+        "results": results,
+    }
+
+
+def _index(report):
+    return {(r["renderer"], r["findings"]): r for r in report["results"]}
+
+
+def compare(current, baseline, threshold):
+    """Print deltas against ``baseline``; return True if anything regressed."""
+    regressed = False
+    base = _index(baseline)
+    print(f"\nCompared with {baseline['meta'].get('git_revision')} ({baseline['meta'].get('timestamp')}):")
+    for key, result in _index(current).items():
+        old = base.get(key)
+        if not old or result["iterations"][0].get("error") or old["iterations"][0].get("error"):
+            continue
+        new_phases = result["iterations"][0].get("timing", {}).get("phases", {})
+        old_phases = old["iterations"][0].get("timing", {}).get("phases", {})
+        for metric, new_value, old_value in [
+            ("cold wall", result["iterations"][0]["wall_s"], old["iterations"][0]["wall_s"]),
+            ("peak rss", result["peak_rss_mb"], old["peak_rss_mb"]),
+            ("output", result["iterations"][0]["output_bytes"], old["iterations"][0]["output_bytes"]),
+        ] + [(f"  {phase}", new_phases[phase], old_phases[phase]) for phase in new_phases if phase in old_phases]:
+            if not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            flag = ""
+            # Stages this short are mostly noise; report them but don't fail on them.
+            is_short_stage = metric.startswith(" ") and old_value < MIN_STAGE_SECONDS
+            if change > threshold and not is_short_stage:
+                flag = "  <-- regression"
+                regressed = True
+            print(f"  {key[0]:<5} {key[1]:>5} {metric:<10} {old_value:>12} -> {new_value:<12} {change:+.1%}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DOCX/PDF report generation.")
+    parser.add_argument("--findings", default="10,100,1000", help="comma separated finding counts")
+    parser.add_argument("--steps", type=int, default=2, help="evidence steps (screenshots) per finding")
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--format", default="png", choices=["png", "jpeg", "bmp"])
+    parser.add_argument("--unique-images", type=int, default=20,
+                        help="distinct screenshots to generate; findings reuse them round-robin")
+    parser.add_argument("--renderers", default="docx,pdf")
+    parser.add_argument("--repeat", type=int, default=2,
+                        help="renders per case; the first is cold, later ones show cache effects")
+    parser.add_argument("--workdir", help="where synthetic evidence and outputs live (default: temp dir)")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    report = run_matrix(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Synthetic ReportRequest payloads and evidence screenshots for benchmarks."""
+import os
+import random
+
+from PIL import Image, ImageDraw
+
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+
+FORMAT_EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "bmp": ".bmp"}
+
+_WORDS = (
+    "attacker request response session token header parameter injection "
+    "server client input output validation access control cookie origin "
+    "payload endpoint redirect script query database privilege account"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng, sentences):
+    return " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+
+def make_screenshot(path, width, height, seed):
+    """Draw a UI-like screenshot (panels, text lines, a noisy photo area).
+
+    Pure noise or flat colour would make compression unrealistically bad or
+    good; this sits in between like real browser/tool captures.
+    """
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width, max(24, height // 20)], fill=(40, 60, 90))
+    y = height // 12
+    while y < height - 20:
+        x = rng.randint(10, width // 10)
+        length = rng.randint(width // 6, width - x - 10)
+        shade = rng.randint(30, 120)
+        draw.rectangle([x, y, x + length, y + max(4, height // 120)], fill=(shade, shade, shade))
+        y += max(10, height // 40)
+    box = (width // 2, height // 3, width // 2 + width // 4, height // 3 + height // 4)
+    noise = Image.effect_noise((box[2] - box[0], box[3] - box[1]), 40 + seed % 30).convert("RGB")
+    img.paste(noise, box[:2])
+    img.save(path)
+
+
+def generate_screenshots(directory, count, width, height, fmt="png"):
+    """Create ``count`` screenshots under ``directory`` and return their URL paths."""
+    os.makedirs(directory, exist_ok=True)
+    ext = FORMAT_EXTENSIONS[fmt]
+    urls = []
+    for i in range(count):
+        name = f"bench_{width}x{height}_{i:04d}{ext}"
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            make_screenshot(path, width, height, seed=i)
+        urls.append(f"/{os.path.basename(os.path.normpath(directory))}/{name}")
+    return urls
+
+
+def synthetic_payload(findings, steps_per_finding, screenshot_urls, seed=0):
+    """Return a ReportRequest-shaped dict with ``findings`` findings.
+
+    Severities cycle through all four levels; each finding gets
+    ``steps_per_finding`` evidence steps with one screenshot each, taken
+    round-robin from ``screenshot_urls``.
+    """
+    rng = random.Random(seed)
+    vulnerabilities = []
+    evidence_data = {}
+    shot = 0
+    for i in range(findings):
+        instance_id = f"bench-{i}"
+        vulnerabilities.append({
+            "id": i + 1,
+            "title": f"Synthetic finding {i + 1}: {_sentence(rng, 4)[:-1]}",
+            "severity": SEVERITIES[i % len(SEVERITIES)],
+            "cvss_score": f"{rng.uniform(2, 10):.1f}",
+            "cvss_vector": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            "description": _paragraph(rng, 5),
+            "recommendation": _paragraph(rng, 3),
+            "reference": "https://owasp.org/www-project-top-ten/",
+            "instanceId": instance_id,
+        })
+        steps = []
+        for s in range(steps_per_finding):
+            paths = []
+            if screenshot_urls:
+                paths.append(screenshot_urls[shot % len(screenshot_urls)])
+                shot += 1
+            steps.append({"comment": _sentence(rng, 12), "screenshotPath": paths})
+        evidence_data[instance_id] = steps
+
+    return {
+        "app_title": "Synthetic Benchmark Application",
+        "scope": "Full application",
+        "urls": "https://bench.example.com",
+        "analyst_name": "Benchmark",
+        "requester_name": "Benchmark",
+        "vulnerabilities": vulnerabilities,
+        "evidence_data": evidence_data,
+    }
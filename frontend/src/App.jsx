@@ -1,12 +1,13 @@
 // src/App.jsx
 
-import { useState } from 'react';
+import { useCallback, useMemo, useState } from 'react';
 import ProjectInfo from './components/ProjectInfo';
 import VulnerabilityPicker from './components/VulnerabilityPicker';
 import ManageVulns from './components/ManageVulns';
 import EvidenceEditor from './components/EvidenceEditor';
 import SummaryView from './components/SummaryView';
 import ReportForm from './components/ReportForm';
+import { buildDraftDocument, useDraftAutosave } from './drafts';
 import { ToastContainer } from 'react-toastify';
 import 'react-toastify/dist/ReactToastify.css';
 
@@ -23,6 +24,26 @@ function App() {
   const [selectedVulns, setSelectedVulns] = useState([]);
   const [evidenceMap, setEvidenceMap] = useState({});
 
+  // Autosaved to a server-side draft; open ?draft=<id> to continue it elsewhere.
+  const draftDoc = useMemo(
+    () => buildDraftDocument(projectInfo, selectedVulns, evidenceMap),
+    [projectInfo, selectedVulns, evidenceMap]
+  );
+  const applyDraft = useCallback((state) => {
+    setProjectInfo(state.projectInfo);
+    setSelectedVulns(state.selected);
+    setEvidenceMap(state.evidenceMap);
+  }, []);
+  const {
+    draftId, status: draftStatus, flush: flushDraft, reload: reloadDraft, reset: resetDraft
+  } = useDraftAutosave(draftDoc, applyDraft);
+
+  const startNewReport = () => {
+    if (window.confirm('Start a new report? The current one stays saved as a draft.')) {
+      resetDraft().then(() => setTab('project'));
+    }
+  };
+
   const tabs = [
     { id: 'project', label: 'Project Info' },
     { id: 'picker', label: 'Vulnerability Picker' },
@@ -38,6 +59,23 @@ function App() {
         DVAReporter - Web
       </h1>
 
+      {draftId && draftStatus !== 'conflict' && (
+        <p className="text-center text-xs text-gray-500 mb-2">
+          Draft {draftId.slice(0, 8)} · {{ loading: 'loading…', saving: 'saving…', error: 'not saved' }[draftStatus] || 'saved'}
+          {' · '}
+          <button className="underline" onClick={startNewReport}>New report</button>
+        </p>
+      )}
+
+      {draftStatus === 'conflict' && (
+        <p className="text-center text-sm text-red-600 mb-2">
+          This draft was changed elsewhere, so your latest edits were not saved.{' '}
+          <button className="underline" onClick={() => reloadDraft().catch(() => {})}>
+            Load the saved version
+          </button>
+        </p>
+      )}
+
       <div className="flex justify-center gap-2 mb-6">
         {tabs.map((t) => (
           <button
@@ -91,8 +129,8 @@ function App() {
         {tab === 'generate' && (
           <ReportForm
             selected={selectedVulns}
-            evidenceMap={evidenceMap}
             projectInfo={projectInfo}
+            flushDraft={flushDraft}
           />
         )}
       </div>
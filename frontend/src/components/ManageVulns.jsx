@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { toast } from 'react-toastify';
 
@@ -7,6 +7,7 @@ function ManageVulns() {
   const [vulns, setVulns] = useState([]);
   const [file, setFile] = useState(null);
   const [editingId, setEditingId] = useState(null);
+  const revision = useRef(null);
 
   function initialForm() {
     return {
@@ -23,9 +24,29 @@ function ManageVulns() {
 
   const fetchVulnerabilities = async () => {
     const res = await axios.get('http://127.0.0.1:8000/vulnerabilities/');
+    revision.current = res.headers['x-catalog-revision'] ?? null;
     setVulns(res.data);
   };
 
+  // After a save or import, fetch only what changed since the last load.
+  const syncVulnerabilities = async () => {
+    if (revision.current === null) return fetchVulnerabilities();
+    try {
+      const res = await axios.get('http://127.0.0.1:8000/vulnerabilities/changes', { params: { since: revision.current } });
+      const { changed, deleted } = res.data;
+      revision.current = res.data.revision;
+      setVulns(prev => {
+        const byId = new Map(prev.map(v => [v.id, v]));
+        deleted.forEach(id => byId.delete(id));
+        changed.forEach(v => byId.set(v.id, v));
+        return [...byId.values()].sort((a, b) => a.id - b.id);
+      });
+    } catch (err) {
+      // 410: the catalog was reset; anything else, start over too.
+      fetchVulnerabilities();
+    }
+  };
+
   useEffect(() => {
     fetchVulnerabilities();
   }, []);
@@ -47,7 +68,7 @@ function ManageVulns() {
       }
       setForm(initialForm());
       setEditingId(null);
-      fetchVulnerabilities();
+      syncVulnerabilities();
     } catch (err) {
       /* alert('Error saving!'); */
       toast.error("Error saving!");
@@ -76,10 +97,14 @@ function ManageVulns() {
 
   try {
     const response = await axios.post('http://127.0.0.1:8000/vulnerabilities/upload_excel/', formData);
-    const { inserted, updated, skipped } = response.data;
+    const { inserted, updated, skipped, invalid, failed, diagnostics } = response.data;
     toast.success(`✅ Excel Upload Complete\n• Inserted: ${inserted}\n• Updated: ${updated}\n• Skipped: ${skipped}`);
+    if (invalid || failed) {
+      console.warn('Rows not imported:', diagnostics);
+      toast.warning(`⚠️ ${invalid + failed} row(s) not imported, e.g. row ${diagnostics[0].row}: ${diagnostics[0].reason}`);
+    }
     setFile(null);
-    fetchVulnerabilities();
+    syncVulnerabilities();
   } catch (err) {
     console.error(err);
     toast.error("❌ Excel upload failed!");
@@ -173,6 +198,13 @@ function ManageVulns() {
           >
             Download Sample Excel
           </a>
+          <a
+            href="http://127.0.0.1:8000/vulnerabilities/export?format=xlsx"
+            className="bg-gray-600 hover:bg-gray-700 text-white px-6 py-2 rounded"
+            download
+          >
+            Export Catalog
+          </a>
         </div>
       </div>
 
@@ -1,24 +1,9 @@
 import { useState } from 'react';
 import axios from 'axios';
 
-function ReportForm({ selected, evidenceMap, projectInfo }) {
+function ReportForm({ selected, projectInfo, flushDraft }) {
   const [loading, setLoading] = useState(false);
 
-  const sanitizeEvidence = (map) => {
-    const clean = {};
-    for (const k in map) {
-      clean[k] = map[k].map(s => ({
-        comment: s.comment,
-        screenshotPath: Array.isArray(s.screenshotPath)
-  ? s.screenshotPath.filter(p => typeof p === 'string' && p.startsWith('/'))
-  : (typeof s.screenshotPath === 'string' && s.screenshotPath.startsWith('/')
-      ? [s.screenshotPath]
-      : [])
-      }));
-    }
-    return clean;
-  };
-
   const handleSubmit = async () => {
     if (!projectInfo.title || !projectInfo.scope || !projectInfo.urls || !projectInfo.analyst || !projectInfo.requester) {
       return alert("Fill all Project Info fields.");
@@ -29,15 +14,11 @@ function ReportForm({ selected, evidenceMap, projectInfo }) {
 
     setLoading(true);
     try {
-      const res = await axios.post("http://127.0.0.1:8000/report/", {
-        app_title: projectInfo.title,
-        scope: projectInfo.scope,
-        urls: projectInfo.urls,
-        analyst_name: projectInfo.analyst,
-        requester_name: projectInfo.requester,
-        vulnerabilities: selected,
-        evidence_data: sanitizeEvidence(evidenceMap)
-      }, { responseType: 'blob' });
+      // Generate from the autosaved draft; only pending edits go over the wire.
+      const draftId = await flushDraft();
+      const res = await axios.post(`http://127.0.0.1:8000/report/drafts/${draftId}/report`, null, {
+        responseType: 'blob'
+      });
 
       const blob = new Blob([res.data], {
         type: 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
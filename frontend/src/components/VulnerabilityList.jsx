@@ -4,7 +4,7 @@ import axios from 'axios';
 
 function VulnerabilityList({ vulnerabilities, setVulnerabilities, selected, setSelected }) {
   useEffect(() => {
-    axios.get('http://127.0.0.1:8000/vulnerabilities')
+    axios.get('http://127.0.0.1:8000/vulnerabilities/', { params: { fields: 'id,title,severity' } })
       .then(res => setVulnerabilities(res.data))
       .catch(err => console.error('Error fetching vulnerabilities:', err));
   }, [setVulnerabilities]);
@@ -1,5 +1,9 @@
 // src/components/VulnerabilityPicker.jsx
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
+import axios from 'axios';
+
+const VULNS_URL = 'http://127.0.0.1:8000/vulnerabilities/';
+const PAGE_SIZE = 50;
 
 const cvssDefault = {
   AV: '', AC: '', PR: '', UI: '', S: '', C: '', I: '', A: ''
@@ -45,12 +49,30 @@ function VulnerabilityPicker({ selected, setSelected }) {
   const [cvssValues, setCvssValues] = useState({});
   const [searchTerm, setSearchTerm] = useState('');
   const [expandedId, setExpandedId] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+
+  // Only titles and severities are listed; the full entry is fetched on Add.
+  // Typing switches to ranked full-text search (best PAGE_SIZE hits).
+  const fetchPage = useCallback(async (cursor) => {
+    if (searchTerm.trim()) {
+      const res = await axios.get(`${VULNS_URL}search`, { params: { q: searchTerm.trim(), limit: PAGE_SIZE } });
+      setAllVulns(res.data);
+      setNextCursor(null);
+      return;
+    }
+    const params = { fields: 'id,title,severity', sort: 'title', limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    const res = await axios.get(VULNS_URL, { params });
+    setAllVulns(prev => (cursor ? [...prev, ...res.data] : res.data));
+    setNextCursor(res.headers['x-next-cursor'] || null);
+  }, [searchTerm]);
 
   useEffect(() => {
-    fetch("http://127.0.0.1:8000/vulnerabilities/")
-      .then(res => res.json())
-      .then(data => setAllVulns(data));
-  }, []);
+    const timer = setTimeout(() => {
+      fetchPage(null).catch(err => console.error('Error fetching vulnerabilities:', err));
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [fetchPage]);
 
   const handleCVSSChange = (id, key, val) => {
     setCvssValues(prev => ({
@@ -59,9 +81,10 @@ function VulnerabilityPicker({ selected, setSelected }) {
     }));
   };
 
-  const handleAdd = (vuln) => {
-    const calc = calculateCVSS(cvssValues[vuln.id]);
+  const handleAdd = async (summary) => {
+    const calc = calculateCVSS(cvssValues[summary.id]);
     if (!calc) return alert("Please complete CVSS selection!");
+    const vuln = (await axios.get(`${VULNS_URL}${summary.id}`)).data;
 
     let severity = "Low";
     if (calc.score >= 9.0) severity = "Critical";
@@ -86,10 +109,6 @@ function VulnerabilityPicker({ selected, setSelected }) {
     setExpandedId(expandedId === id ? null : id);
   };
 
-  const filteredVulns = allVulns.filter(v =>
-    v.title.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   return (
     <div className="flex gap-6">
       <div className="w-1/2 border p-4 space-y-4 overflow-y-scroll" style={{ maxHeight: '600px' }}>
@@ -102,10 +121,16 @@ function VulnerabilityPicker({ selected, setSelected }) {
           onChange={(e) => setSearchTerm(e.target.value)}
         />
         <ul className="space-y-4">
-          {filteredVulns.map(v => (
+          {allVulns.map(v => (
             <li key={v.id} className="border p-3 rounded bg-white shadow transition">
               <div className="flex justify-between items-center">
-                <div className="font-semibold">{v.title}</div>
+                <div>
+                  <div className="font-semibold">{v.title}</div>
+                  {v.snippet_html && (
+                    // Server-escaped text; only the <mark> tags are markup.
+                    <div className="text-sm text-gray-600" dangerouslySetInnerHTML={{ __html: v.snippet_html }} />
+                  )}
+                </div>
                 <div className="flex gap-2">
                   <button
                     className="text-sm text-blue-600 underline"
@@ -144,6 +169,14 @@ function VulnerabilityPicker({ selected, setSelected }) {
             </li>
           ))}
         </ul>
+        {nextCursor && (
+          <button
+            className="text-sm text-blue-600 underline"
+            onClick={() => fetchPage(nextCursor).catch(err => console.error('Error fetching vulnerabilities:', err))}
+          >
+            Load more
+          </button>
+        )}
       </div>
 
       <div className="w-1/2 border p-4 bg-blue-50 space-y-4 overflow-y-auto" style={{ maxHeight: '600px' }}>
@@ -0,0 +1,241 @@
+// Server-side report drafts (/report/drafts/).
+// The draft is created on the first edit, then only JSON Patch deltas are
+// autosaved. The server deletes drafts nobody has saved for a while.
+
+import { useCallback, useEffect, useRef, useState } from 'react';
+import axios from 'axios';
+
+const DRAFTS_URL = 'http://127.0.0.1:8000/report/drafts';
+const DRAFT_ID_KEY = 'dvaDraftId';
+
+export const sanitizeEvidence = (map) => {
+  const clean = {};
+  for (const k in map) {
+    clean[k] = map[k].map(s => ({
+      comment: s.comment,
+      screenshotPath: Array.isArray(s.screenshotPath)
+        ? s.screenshotPath.filter(p => typeof p === 'string' && p.startsWith('/'))
+        : (typeof s.screenshotPath === 'string' && s.screenshotPath.startsWith('/')
+          ? [s.screenshotPath]
+          : [])
+    }));
+  }
+  return clean;
+};
+
+export const buildDraftDocument = (projectInfo, selected, evidenceMap) => ({
+  app_title: projectInfo.title,
+  scope: projectInfo.scope,
+  urls: projectInfo.urls,
+  analyst_name: projectInfo.analyst,
+  requester_name: projectInfo.requester,
+  vulnerabilities: selected,
+  evidence_data: sanitizeEvidence(evidenceMap)
+});
+
+export const draftToState = (data) => ({
+  projectInfo: {
+    title: data.app_title || '',
+    scope: data.scope || '',
+    urls: data.urls || '',
+    analyst: data.analyst_name || '',
+    requester: data.requester_name || ''
+  },
+  selected: data.vulnerabilities || [],
+  evidenceMap: data.evidence_data || {}
+});
+
+// The document of an untouched form; not worth a draft of its own.
+const EMPTY_DRAFT = buildDraftDocument(draftToState({}).projectInfo, [], {});
+
+const pointer = (...tokens) =>
+  tokens.map(t => '/' + String(t).replace(/~/g, '~0').replace(/\//g, '~1')).join('');
+
+const same = (a, b) => a === b || JSON.stringify(a) === JSON.stringify(b);
+
+// JSON Patch turning draft document `prev` into `next`.
+export const diffDraft = (prev, next) => {
+  const ops = [];
+  for (const key of Object.keys(next)) {
+    const before = prev[key];
+    const after = next[key];
+    if (same(before, after)) continue;
+
+    if (key === 'vulnerabilities' && Array.isArray(before)) {
+      const common = Math.min(before.length, after.length);
+      for (let i = 0; i < common; i++) {
+        if (!same(before[i], after[i])) ops.push({ op: 'replace', path: pointer(key, i), value: after[i] });
+      }
+      for (let i = common; i < after.length; i++) ops.push({ op: 'add', path: pointer(key, '-'), value: after[i] });
+      for (let i = before.length - 1; i >= after.length; i--) ops.push({ op: 'remove', path: pointer(key, i) });
+    } else if (key === 'evidence_data' && before && typeof before === 'object') {
+      for (const id of Object.keys(after)) {
+        if (!(id in before)) ops.push({ op: 'add', path: pointer(key, id), value: after[id] });
+        else if (!same(before[id], after[id])) ops.push({ op: 'replace', path: pointer(key, id), value: after[id] });
+      }
+      for (const id of Object.keys(before)) {
+        if (!(id in after)) ops.push({ op: 'remove', path: pointer(key, id) });
+      }
+    } else {
+      ops.push({ op: 'add', path: pointer(key), value: after });
+    }
+  }
+  return ops;
+};
+
+export const loadDraft = async (id) => (await axios.get(`${DRAFTS_URL}/${id}`)).data;
+
+// The draft to continue: ?draft=<id> (shared link) or the one this browser last saved.
+const storedDraftId = () =>
+  new URLSearchParams(window.location.search).get('draft') || localStorage.getItem(DRAFT_ID_KEY);
+
+// Autosaves `doc` to a server-side draft `delay` ms after the last change.
+// On mount the stored draft is loaded and handed to `onLoad(state)` (see
+// draftToState); nothing is saved until that load has finished, so an empty
+// form never overwrites a saved draft. Every PATCH carries If-Match: if the
+// draft changed elsewhere, status becomes 'conflict' and autosave stops
+// until `reload()` fetches the server's version. No draft is created while
+// the form is still empty. `flush()` saves immediately and resolves to the
+// draft id (null for an empty form); `reset()` saves pending edits, then
+// detaches from the draft and empties the form, so the next edit starts a
+// new draft.
+export function useDraftAutosave(doc, onLoad, delay = 1500) {
+  const [draftId, setDraftId] = useState(() => storedDraftId());
+  const [status, setStatus] = useState(() => (storedDraftId() ? 'loading' : 'idle'));
+  const synced = useRef({ doc: null, version: null });
+  const queue = useRef(Promise.resolve());
+  const held = useRef(Boolean(storedDraftId()));
+  const latest = useRef(doc);
+  latest.current = doc;
+  const onLoadRef = useRef(onLoad);
+  onLoadRef.current = onLoad;
+
+  const load = useCallback(async (id) => {
+    try {
+      const draft = await loadDraft(id);
+      const state = draftToState(draft.data);
+      onLoadRef.current(state);
+      localStorage.setItem(DRAFT_ID_KEY, draft.id);
+      setDraftId(draft.id);
+      synced.current = {
+        doc: buildDraftDocument(state.projectInfo, state.selected, state.evidenceMap),
+        version: draft.version
+      };
+      // Until React re-renders with the loaded state, `doc` is still the old form.
+      latest.current = synced.current.doc;
+    } catch (err) {
+      if (!(err.response && err.response.status === 404)) {
+        // Keep holding: saving now could overwrite a draft we failed to read.
+        console.error('❌ Could not load draft', err);
+        setStatus('error');
+        throw err;
+      }
+      // Deleted on the server; the next save starts a new draft.
+      localStorage.removeItem(DRAFT_ID_KEY);
+      setDraftId(null);
+      synced.current = { doc: null, version: null };
+      held.current = false;
+      setStatus('idle');
+      return;
+    }
+    held.current = false;
+    setStatus('saved');
+  }, []);
+
+  const save = useCallback(async () => {
+    if (held.current) throw new Error('Draft is not loaded or has a conflict');
+    const current = latest.current;
+    const { doc: prev, version } = synced.current;
+    let id = prev ? localStorage.getItem(DRAFT_ID_KEY) : null;
+
+    if (id && same(prev, current)) return id;
+    if (!id && same(current, EMPTY_DRAFT)) return null;
+    setStatus('saving');
+    try {
+      if (!id) {
+        const res = await axios.post(`${DRAFTS_URL}/`, current);
+        id = res.data.id;
+        localStorage.setItem(DRAFT_ID_KEY, id);
+        setDraftId(id);
+        synced.current = { doc: current, version: res.data.version };
+      } else {
+        try {
+          const res = await axios.patch(`${DRAFTS_URL}/${id}`, diffDraft(prev, current), {
+            headers: { 'Content-Type': 'application/json-patch+json', 'If-Match': `"${version}"` }
+          });
+          synced.current = { doc: current, version: res.data.version };
+        } catch (err) {
+          const code = err.response && err.response.status;
+          if (code === 404) {
+            localStorage.removeItem(DRAFT_ID_KEY);
+            synced.current = { doc: null, version: null };
+            return save();
+          }
+          if (code === 412) {
+            // Changed in another tab or by another user: don't overwrite it.
+            held.current = true;
+            setStatus('conflict');
+          }
+          throw err;
+        }
+      }
+      setStatus('saved');
+      return id;
+    } catch (err) {
+      console.error('❌ Draft autosave failed', err);
+      if (!held.current) setStatus('error');
+      throw err;
+    }
+  }, []);
+
+  const flush = useCallback(() => {
+    const next = queue.current.catch(() => {}).then(save);
+    queue.current = next;
+    return next;
+  }, [save]);
+
+  // Replace local edits with the server's copy of the draft (after a conflict).
+  const reload = useCallback(() => {
+    const id = localStorage.getItem(DRAFT_ID_KEY);
+    held.current = true;
+    setStatus('loading');
+    const next = queue.current.catch(() => {}).then(() => load(id));
+    queue.current = next;
+    return next;
+  }, [load]);
+
+  const reset = useCallback(() => {
+    const next = queue.current.catch(() => {})
+      .then(() => (held.current ? null : save()))
+      .catch(() => {})
+      .then(() => {
+        localStorage.removeItem(DRAFT_ID_KEY);
+        const url = new URL(window.location.href);
+        if (url.searchParams.has('draft')) {
+          url.searchParams.delete('draft');
+          window.history.replaceState(null, '', url);
+        }
+        synced.current = { doc: null, version: null };
+        latest.current = EMPTY_DRAFT;
+        held.current = false;
+        setDraftId(null);
+        setStatus('idle');
+        onLoadRef.current(draftToState({}));
+      });
+    queue.current = next;
+    return next;
+  }, [save]);
+
+  useEffect(() => {
+    const id = storedDraftId();
+    if (id) queue.current = load(id);
+  }, [load]);
+
+  useEffect(() => {
+    if (status === 'loading' || status === 'conflict') return undefined;
+    const timer = setTimeout(() => { flush().catch(() => {}); }, delay);
+    return () => clearTimeout(timer);
+  }, [doc, delay, flush, status]);
+
+  return { draftId, status, flush, reload, reset };
+}
@@ -0,0 +1,72 @@
+"""Mixed catalog batches (webapp.catalog_batch)."""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from webapp import catalog_batch, models, schemas  # noqa: E402
+from webapp.database import Base  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(models.Vulnerability(id=i, title=f"Vuln {i}", severity="Low") for i in range(1, 6))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _entry(title):
+    fields = ("severity", "cvss_score", "cvss_vector", "description", "evidence", "recommendation", "reference")
+    return dict({name: "" for name in fields}, title=title)
+
+
+def _ops(*operations):
+    return [schemas.BatchOperation(**op) for op in operations]
+
+
+def _titles(db):
+    v = models.Vulnerability
+    return dict(db.execute(select(v.id, v.title)).all())
+
+
+def test_swapped_titles_apply(db):
+    results = catalog_batch.apply_batch(db, _ops(
+        {"op": "update", "id": 2, "data": {"title": "Vuln 4"}},
+        {"op": "update", "id": 4, "data": {"title": "Vuln 2", "severity": "High"}},
+    ))
+    assert [r["status"] for r in results] == ["updated", "updated"]
+    assert _titles(db) == {1: "Vuln 1", 2: "Vuln 4", 3: "Vuln 3", 4: "Vuln 2", 5: "Vuln 5"}
+
+
+def test_rotated_titles_with_create_apply(db):
+    catalog_batch.apply_batch(db, _ops(
+        {"op": "update", "id": 1, "data": {"title": "Vuln 2"}},
+        {"op": "update", "id": 2, "data": {"title": "Vuln 3"}},
+        {"op": "update", "id": 3, "data": {"title": "Vuln 6"}},
+        {"op": "create", "data": _entry("Vuln 1")},
+    ))
+    titles = _titles(db)
+    assert [titles[i] for i in (1, 2, 3)] == ["Vuln 2", "Vuln 3", "Vuln 6"]
+    assert sorted(titles.values()) == ["Vuln 1", "Vuln 2", "Vuln 3", "Vuln 4", "Vuln 5", "Vuln 6"]
+
+
+def test_title_clash_is_reported_per_operation(db):
+    with pytest.raises(catalog_batch.BatchError) as info:
+        catalog_batch.apply_batch(db, _ops(
+            {"op": "update", "id": 2, "data": {"title": "Vuln 4"}},
+            {"op": "update", "id": 3, "data": {"severity": "High"}},
+        ))
+    assert info.value.status_code == 409
+    assert [r["status"] for r in info.value.results] == ["error", "not_applied"]
+    assert _titles(db)[2] == "Vuln 2"
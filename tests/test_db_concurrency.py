@@ -0,0 +1,103 @@
+"""SQLite settings (webapp.database.SQLITE_PRAGMAS) keep reads flowing during a bulk write.
+
+A small version of benchmarks/db_concurrency.py.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from webapp import database, models  # noqa: E402
+
+# Keeps a regression from hanging the run for the default 30 s.
+BUSY_TIMEOUT_MS = 2000
+
+
+def _entries(start, count):
+    return [{"title": f"Entry {i}", "severity": "Low", "description": "x" * 200} for i in range(start, start + count)]
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.setitem(database.SQLITE_PRAGMAS, "busy_timeout", BUSY_TIMEOUT_MS)
+    engines = []
+
+    def make(journal_mode=database.SQLITE_PRAGMAS["journal_mode"]):
+        monkeypatch.setitem(database.SQLITE_PRAGMAS, "journal_mode", journal_mode)
+        engine = create_engine(
+            f"sqlite:///{tmp_path / journal_mode}.db",
+            connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000}
+        )
+        event.listen(engine, "connect", database._set_sqlite_pragmas)
+        database.Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Vulnerability), _entries(0, 100))
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def _begin_bulk_write(engine):
+    """Open a connection holding the write lock mid-import; caller commits."""
+    raw = engine.raw_connection()
+    cursor = raw.cursor()
+    cursor.execute("BEGIN EXCLUSIVE")
+    cursor.executemany(
+        "INSERT INTO vulnerabilities (title, severity, description) VALUES (:title, :severity, :description)",
+        _entries(100, 2000)
+    )
+    return raw
+
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(models.Vulnerability))
+
+
+def test_reads_during_bulk_write(make_engine):
+    engine = make_engine()
+    writer = _begin_bulk_write(engine)
+    try:
+        started = time.perf_counter()
+        assert _count(engine) == 100
+        assert time.perf_counter() - started < BUSY_TIMEOUT_MS / 1000 / 2
+    finally:
+        writer.commit()
+        writer.close()
+    assert _count(engine) == 2100
+
+
+def test_rollback_journal_blocks_reads(make_engine):
+    # What WAL avoids: with the old journal a reader fails with "database is locked".
+    engine = make_engine("DELETE")
+    writer = _begin_bulk_write(engine)
+    try:
+        with pytest.raises(OperationalError, match="database is locked"):
+            _count(engine)
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_second_writer_waits_for_the_first(make_engine):
+    engine = make_engine()
+    writer = _begin_bulk_write(engine)
+    commit = threading.Timer(0.3, writer.commit)
+    commit.start()
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(models.Vulnerability), _entries(5000, 1))
+    finally:
+        commit.join()
+        writer.close()
+    assert _count(engine) == 2101
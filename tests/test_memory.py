@@ -0,0 +1,71 @@
+"""Bounded-memory report generation (webapp.memory) stays flat with default settings."""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.report_bench import run_case_subprocess  # noqa: E402
+from benchmarks.synthetic import generate_screenshots, synthetic_payload  # noqa: E402
+
+CACHE_SETTINGS = ("DVA_IMAGE_CACHE_MB", "DVA_FRAGMENT_CACHE_MB")
+
+
+def _render(payload, bounded):
+    from webapp.docx_report import render_docx
+    from webapp.report_model import build_report_model
+    from webapp.routers.report import ReportRequest
+
+    model = build_report_model(ReportRequest(**payload), bounded=bounded)
+    render_docx(model, "report.docx")
+
+
+def test_bounded_render_does_not_fill_caches(tmp_path, monkeypatch):
+    from webapp.fragments import fragment_cache
+    from webapp.images import rendition_cache
+
+    monkeypatch.chdir(tmp_path)
+    screenshots = generate_screenshots("uploaded_evidence", 4, 320, 240)
+    payload = synthetic_payload(2, 2, screenshots)
+    fragment_cache.clear()
+    rendition_cache.clear()
+
+    _render(payload, bounded=True)
+    assert len(fragment_cache) == 0
+    assert len(rendition_cache) == 0
+
+    _render(payload, bounded=False)
+    assert len(fragment_cache) == 2
+    assert len(rendition_cache) == 4
+
+
+@pytest.mark.slow
+def test_bounded_peak_rss_is_flat(tmp_path, monkeypatch):
+    # Same measurement as benchmarks/memory_check.py, at the default cache sizes.
+    # test_bounded_render_does_not_fill_caches covers the caches in the default run.
+    for name in CACHE_SETTINGS:
+        monkeypatch.delenv(name, raising=False)
+    counts = (20, 80)
+    screenshots = generate_screenshots(str(tmp_path / "uploaded_evidence"), counts[-1] * 2, 1024, 768)
+
+    results = {}
+    for findings in counts:
+        case = {
+            "renderer": "docx", "findings": findings, "steps": 2, "resolution": "1024x768",
+            "format": "png", "bounded": True, "to_file": True,
+            "screenshots": screenshots[:findings * 2], "repeat": 1,
+        }
+        result = run_case_subprocess(case, str(tmp_path))
+        assert result["iterations"][0]["error"] is None
+        results[findings] = result
+
+    growth_mb = results[counts[-1]]["peak_rss_mb"] - results[counts[0]]["peak_rss_mb"]
+    added_mb = (
+        results[counts[-1]]["iterations"][0]["output_bytes"]
+        - results[counts[0]]["iterations"][0]["output_bytes"]
+    ) / (1024 * 1024)
+    # Holding the added images once (e.g. in a cache) would already cost
+    # about ``added_mb``; what's left is the document's XML tree.
+    assert growth_mb < 0.6 * added_mb, f"peak RSS grew {growth_mb:.1f} MB for {added_mb:.1f} MB of images"
@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+import time
+import uuid
+
+from webapp.jobs import LEASE_SECONDS
+
+ARTIFACT_DIR = os.environ.get("DVA_ARTIFACT_DIR", "generated_reports")
+ARTIFACT_MAX_BYTES = int(float(os.environ.get("DVA_ARTIFACT_MAX_MB", "1024")) * 1024 * 1024)
+ARTIFACT_TTL_SECONDS = int(float(os.environ.get("DVA_ARTIFACT_TTL_HOURS", "24")) * 3600)
+EVICTION_INTERVAL_SECONDS = int(os.environ.get("DVA_ARTIFACT_EVICT_INTERVAL", "300"))
+
+# Only files we generate are managed; anything else in the directory
+# (e.g. the job queue database) is left alone.
+ARTIFACT_NAME_RE = re.compile(r"^(report|pie)_[0-9a-f]{32}\.(docx|pdf|html|png|zip)$")
+# Job output being written by a worker (webapp.worker.run_job). One that
+# hasn't been touched for a whole lease belongs to a worker that died.
+PART_NAME_RE = re.compile(r"^report_[0-9a-f]{32}\.(docx|pdf|html)\.[0-9a-f]{32}\.part$")
+
+
+class ArtifactStore:
+    """Generated files on disk with a TTL and total-size retention policy."""
+
+    def __init__(self, root, max_bytes, ttl_seconds):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        os.makedirs(self.root, exist_ok=True)
+
+    def new_path(self, prefix, ext, key=None):
+        name = f"{prefix}_{key or uuid.uuid4().hex}{ext}"
+        return name, os.path.join(self.root, name)
+
+    def path_for(self, name):
+        """Return the on-disk path of a managed artifact, or None."""
+        if not ARTIFACT_NAME_RE.match(name):
+            return None
+        path = os.path.join(self.root, name)
+        return path if os.path.isfile(path) else None
+
+    def _managed_files(self, pattern=ARTIFACT_NAME_RE):
+        files = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and pattern.match(entry.name):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, now=None):
+        """Delete expired artifacts, then the oldest ones until under budget.
+
+        Partial job output left behind by a crashed worker goes too.
+        """
+        now = now or time.time()
+        removed = []
+        with self._lock:
+            for mtime, _, path in self._managed_files(PART_NAME_RE):
+                if now - mtime > LEASE_SECONDS and self._remove(path):
+                    removed.append(path)
+
+            files = sorted(self._managed_files())
+            kept = []
+            for mtime, size, path in files:
+                if now - mtime > self.ttl_seconds:
+                    if self._remove(path):
+                        removed.append(path)
+                else:
+                    kept.append((mtime, size, path))
+
+            total = sum(size for _, size, _ in kept)
+            for mtime, size, path in kept:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    removed.append(path)
+                    total -= size
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️ Could not delete artifact {path}: {e}")
+            return False
+
+    def start_eviction(self, interval=EVICTION_INTERVAL_SECONDS):
+        if self._thread is not None:
+            return
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    removed = self.evict()
+                    if removed:
+                        print(f"🧹 Evicted {len(removed)} generated artifacts")
+                except Exception as e:
+                    print(f"⚠️ Artifact eviction failed: {e}")
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_loop, name="artifact-eviction", daemon=True)
+        self._thread.start()
+
+    def stop_eviction(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+artifact_store = ArtifactStore(ARTIFACT_DIR, ARTIFACT_MAX_BYTES, ARTIFACT_TTL_SECONDS)
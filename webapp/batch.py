@@ -0,0 +1,147 @@
+"""Render many saved projects to DOCX without the UI.
+
+    python -m webapp.batch projects/ "archive/2025-Q3/*.json" -o out/ -j 8
+
+Accepts project files saved by the desktop app (``project_info``,
+``selected_vulnerabilities``, ``summary``) as well as raw ``/report/``
+request payloads. Run it from the directory that holds ``uploaded_evidence/``
+and ``uploaded_logos/``, like the API.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def collect_project_files(patterns):
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "*.json"))
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        files.extend(sorted(matches))
+    return list(dict.fromkeys(files))
+
+
+def output_paths(files, output_dir):
+    """Map each project file to its .docx under ``output_dir``.
+
+    Subdirectories below the files' common root are mirrored, so
+    ``a/app.json`` and ``b/app.json`` become ``a/app.docx`` and
+    ``b/app.docx``; files from one directory keep their plain stem.
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    return {
+        f: os.path.join(output_dir, os.path.splitext(os.path.relpath(os.path.abspath(f), root))[0] + ".docx")
+        for f in files
+    }
+
+
+def output_collisions(outputs):
+    """Groups of inputs that would still write the same file (e.g. p.json and p.JSON)."""
+    by_output = {}
+    for project_path, output_path in outputs.items():
+        by_output.setdefault(os.path.normcase(output_path).casefold(), []).append(project_path)
+    return [paths for paths in by_output.values() if len(paths) > 1]
+
+
+def project_to_payload(data):
+    """Convert a saved project (or a raw request payload) to ReportRequest fields."""
+    if "app_title" in data:
+        return data
+
+    info = data.get("project_info", {})
+    vulnerabilities = []
+    evidence_data = {}
+    for i, vuln in enumerate(data.get("selected_vulnerabilities", []), 1):
+        instance_id = str(vuln.get("instanceId") or f"{vuln.get('id', 0)}-{i}")
+        vulnerabilities.append({
+            "id": vuln.get("id") or i,
+            "title": vuln.get("title", ""),
+            "severity": vuln.get("severity", ""),
+            "cvss_score": str(vuln.get("cvss_score") or ""),
+            "cvss_vector": vuln.get("cvss_vector") or "",
+            "description": vuln.get("description") or "",
+            "recommendation": vuln.get("recommendation") or "",
+            "reference": vuln.get("reference") or "",
+            "instanceId": instance_id,
+        })
+        # The desktop app keeps evidence as free text on the finding.
+        if vuln.get("evidence"):
+            evidence_data[instance_id] = [{"comment": vuln["evidence"], "screenshotPath": []}]
+
+    return {
+        "app_title": info.get("project_title", ""),
+        "scope": info.get("scope", ""),
+        "urls": info.get("urls", ""),
+        "analyst_name": info.get("analyst_name", ""),
+        "requester_name": info.get("requester_name", ""),
+        "vulnerabilities": vulnerabilities,
+        "evidence_data": evidence_data,
+    }
+
+
+def render_project(project_path, output_path, template=None):
+    """Render one project file to ``output_path``. Runs in a worker process."""
+    from webapp.routers.report import ReportRequest, render_report
+
+    start = time.perf_counter()
+    try:
+        with open(project_path, "r") as f:
+            payload = project_to_payload(json.load(f))
+        if template:
+            payload = dict(payload, template=template)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        render_report(ReportRequest(**payload), output_path)
+        return project_path, output_path, time.perf_counter() - start, None
+    except Exception as e:
+        return project_path, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render saved DVA projects to DOCX in parallel.")
+    parser.add_argument("inputs", nargs="+", help="project files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", default="batch_reports")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("-t", "--template", help="branded template name to use for every report")
+    args = parser.parse_args(argv)
+
+    files = collect_project_files(args.inputs)
+    if not files:
+        print("No project files found.")
+        return 1
+    outputs = output_paths(files, args.output_dir)
+    collisions = output_collisions(outputs)
+    if collisions:
+        for paths in collisions:
+            print(f"❌ These would overwrite each other's report: {', '.join(paths)}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"Rendering {len(files)} project(s) with {args.jobs} worker(s)...")
+    start = time.perf_counter()
+    failures = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(render_project, f, outputs[f], args.template) for f in files]
+        for future in as_completed(futures):
+            project_path, output_path, seconds, error = future.result()
+            if error:
+                failures.append((project_path, error))
+                print(f"❌ {project_path} ({seconds:.2f}s): {error}")
+            else:
+                print(f"✅ {project_path} -> {output_path} ({seconds:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\nDone in {elapsed:.2f}s: {len(files) - len(failures)} succeeded, {len(failures)} failed.")
+    for project_path, error in failures:
+        print(f"  - {project_path}: {error}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Streaming ZIP export of a report with its evidence and findings data.
+
+The archive is produced by ``zipfile`` writing into a small in-memory
+buffer that is drained after every chunk, so memory stays flat regardless
+of evidence size. Entries are ordered so bytes go out immediately: the
+original screenshots first (each checked just before it is streamed in
+chunks, already-compressed formats stored as-is), then the findings data,
+which lists any screenshot that was skipped, and finally the DOCX report.
+The DOCX is the one entry that can't be streamed as it is produced: it is
+rendered in memory and spills to a temporary file above
+REPORT_SPOOL_BYTES before being copied in chunks.
+"""
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+import zipfile
+from datetime import datetime
+
+CHUNK_SIZE = 1024 * 1024
+
+# The DOCX is rendered before it is archived; above this it spills to a temp file.
+REPORT_SPOOL_BYTES = 32 * 1024 * 1024
+
+# Formats that don't shrink any further under deflate.
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".docx", ".pdf", ".zip"}
+
+FINDING_FIELDS = [
+    "index", "title", "severity", "cvss_score", "cvss_vector",
+    "description", "recommendation", "reference", "evidence_steps", "screenshots"
+]
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands back what was written."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _slug(text, limit=40):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")
+    return slug[:limit] or "finding"
+
+
+def _zip_info(name, size=0):
+    info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+    ext = os.path.splitext(name)[1].lower()
+    info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    # Lets zipfile pick ZIP64 up front for multi-GB entries.
+    info.file_size = size
+    return info
+
+
+def _unique_name(name, used):
+    stem, ext = os.path.splitext(name)
+    counter = 2
+    while name in used:
+        name = f"{stem}_{counter}{ext}"
+        counter += 1
+    used.add(name)
+    return name
+
+
+def _plan_evidence(model):
+    """Return (findings rows, [(archive name, EvidenceImage, step, row)]) for a ReportModel.
+
+    Only screenshots inside uploaded_evidence/ (report_model.evidence_file)
+    are planned; ``step`` and ``row`` are the parts of the findings rows that
+    list the entry, see _skip_evidence.
+    """
+    rows = []
+    files = []
+    used = set()
+    for finding in model.findings:
+        folder = f"evidence/{finding.index:03d}_{_slug(finding.title)}"
+        steps = []
+        archived = []
+        row = dict(
+            {k: v for k, v in finding._asdict().items() if k != "steps"},
+            evidence=steps,
+            screenshots=archived
+        )
+        for step_idx, step in enumerate(finding.steps, 1):
+            entry = {"comment": step.comment, "screenshots": [], "skipped": []}
+            for image in step.images:
+                if not image.exists:
+                    continue
+                name = _unique_name(f"{folder}/step{step_idx:02d}_{os.path.basename(image.full_path)}", used)
+                files.append((name, image, entry, row))
+                entry["screenshots"].append(name)
+                archived.append(name)
+            steps.append(entry)
+        rows.append(row)
+    return rows, files
+
+
+def _skip_evidence(name, image, step, row):
+    """Move a screenshot that turned out not to be an image to its step's ``skipped``."""
+    step["screenshots"].remove(name)
+    row["screenshots"].remove(name)
+    step["skipped"].append(image.clean_path)
+    print(f"⚠️ Not bundling {image.clean_path}: not a decodable image")
+
+
+def _findings_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FINDING_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(dict(
+            {k: row[k] for k in FINDING_FIELDS if k in row},
+            evidence_steps=len(row["evidence"]),
+            screenshots=";".join(row["screenshots"])
+        ))
+    return out.getvalue().encode("utf-8")
+
+
+def iter_report_bundle(payload):
+    """Yield the bytes of a ZIP bundle for ``payload`` (a ReportRequest)."""
+    for chunk in _iter_bundle(payload):
+        if chunk:
+            yield chunk
+
+
+def _iter_bundle(payload):
+    from webapp.docx_report import render_docx
+    from webapp.images import is_image_file
+    from webapp.routers.report import report_model
+
+    sink = _ChunkBuffer()
+    model = report_model(payload)
+    rows, files = _plan_evidence(model)
+
+    with zipfile.ZipFile(sink, "w") as zf:
+        for name, image, step, row in files:
+            path = image.full_path
+            if not is_image_file(path):
+                _skip_evidence(name, image, step, row)
+                continue
+            with open(path, "rb") as src, zf.open(_zip_info(name, os.path.getsize(path)), "w") as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+
+        findings = dict(model.info._asdict(), findings=rows)
+        zf.writestr(_zip_info("findings.json"), json.dumps(findings, indent=2).encode("utf-8"))
+        zf.writestr(_zip_info("findings.csv"), _findings_csv(rows))
+        yield sink.drain()
+
+        with tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES) as report:
+            render_docx(model, report)
+            size = report.tell()
+            report.seek(0)
+            with zf.open(_zip_info("DVA_Report.docx", size), "w") as dst:
+                while True:
+                    chunk = report.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    yield sink.drain()
+        yield sink.drain()
+
+    yield sink.drain()
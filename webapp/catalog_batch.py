@@ -0,0 +1,160 @@
+"""Mixed create/update/delete operations on the catalog in one transaction.
+
+Every operation is validated and checked against the database (unknown
+ids, title clashes) before anything is written; then deletes, updates and
+creates each go out as a single executemany statement and are committed
+together. Either the whole batch applies or nothing does. Renames that
+swap or rotate titles between entries go through temporary titles first,
+so the unique constraint never sees two entries with the same title.
+"""
+import os
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from webapp import crud, models, schemas
+
+MAX_BATCH_OPERATIONS = int(os.environ.get("DVA_CATALOG_BATCH_MAX", "5000"))
+
+
+class BatchError(ValueError):
+    """The batch was rejected; ``results`` says which operations failed and why."""
+
+    def __init__(self, status_code, message, results):
+        super().__init__(message)
+        self.status_code = status_code
+        self.results = results
+
+
+def _validation_message(error):
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+def _check(operations):
+    """Validate operations; returns ``(values per operation, errors by index)``."""
+    values, errors = [], {}
+    touched = {}
+    for i, operation in enumerate(operations):
+        values.append(None)
+        if operation.op != "create":
+            if operation.id is None:
+                errors[i] = f"{operation.op} needs an id"
+                continue
+            if operation.id in touched:
+                errors[i] = f"id {operation.id} is already changed by operation {touched[operation.id]}"
+                continue
+            touched[operation.id] = i
+        if operation.op == "delete":
+            continue
+        if operation.data is None:
+            errors[i] = f"{operation.op} needs data"
+            continue
+        try:
+            if operation.op == "create":
+                values[i] = schemas.VulnerabilityCreate(**operation.data).model_dump()
+            else:
+                values[i] = schemas.VulnerabilityUpdate(**operation.data).model_dump(exclude_none=True)
+        except ValidationError as e:
+            errors[i] = _validation_message(e)
+            continue
+        if operation.op == "update" and not values[i]:
+            errors[i] = "update has no fields to change"
+    return values, errors
+
+
+def _check_database(db, operations, values, errors, conflicts):
+    """Check ids and titles against the catalog; returns ``{id: current title}``."""
+    v = models.Vulnerability
+    ids = [op.id for i, op in enumerate(operations) if op.op != "create" and i not in errors]
+    existing = {row.id: row.title for row in db.execute(select(v.id, v.title).where(v.id.in_(ids)))} if ids else {}
+    for i, operation in enumerate(operations):
+        if operation.op != "create" and i not in errors and operation.id not in existing:
+            errors[i] = f"Vulnerability {operation.id} not found"
+
+    # Titles are unique; work out what the catalog would hold after the batch.
+    released = {
+        existing[op.id] for i, op in enumerate(operations)
+        if op.id in existing and (op.op == "delete" or "title" in (values[i] or {}))
+    }
+    claimed = {}
+    for i, operation in enumerate(operations):
+        title = (values[i] or {}).get("title")
+        if i in errors or title is None or (operation.op == "update" and existing.get(operation.id) == title):
+            continue
+        if title in claimed:
+            errors[i] = f"title {title!r} is also used by operation {claimed[title]}"
+            conflicts.add(i)
+        else:
+            claimed[title] = i
+    if claimed:
+        taken = set(db.scalars(select(v.title).where(v.title.in_(list(claimed))))) - released
+        for title in taken:
+            errors[claimed[title]] = f"title {title!r} already exists"
+            conflicts.add(claimed[title])
+    return existing
+
+
+def _park_renamed(db, updates, existing):
+    """Move renamed entries to temporary titles if one takes another's old title."""
+    renamed = [u for u in updates if "title" in u and u["title"] != existing[u["id"]]]
+    old_titles = {existing[u["id"]] for u in renamed}
+    if any(u["title"] in old_titles for u in renamed):
+        v = models.Vulnerability
+        token = uuid.uuid4().hex
+        db.execute(update(v), [{"id": u["id"], "title": f"~{token}-{u['id']}"} for u in renamed])
+
+
+def apply_batch(db, operations):
+    """Apply ``operations`` (schemas.BatchOperation) atomically.
+
+    Returns one result per operation, in order. Raises BatchError (422 for
+    invalid operations or unknown ids, 409 for title conflicts) without
+    writing anything.
+    """
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(413, f"At most {MAX_BATCH_OPERATIONS} operations per batch", [])
+
+    values, errors = _check(operations)
+    conflicts = set()
+    existing = _check_database(db, operations, values, errors, conflicts)
+    if errors:
+        status_code = 409 if conflicts == set(errors) else 422
+        results = [
+            {"index": i, "op": op.op, "id": op.id, "status": "error" if i in errors else "not_applied",
+             **({"error": errors[i]} if i in errors else {})}
+            for i, op in enumerate(operations)
+        ]
+        raise BatchError(status_code, f"{len(errors)} of {len(operations)} operations are invalid", results)
+
+    v = models.Vulnerability
+    deletes = [op.id for op in operations if op.op == "delete"]
+    updates = [dict(values[i], id=op.id) for i, op in enumerate(operations) if op.op == "update"]
+    creates = [values[i] for i, op in enumerate(operations) if op.op == "create"]
+    try:
+        crud.bump_catalog_version(db)
+        if deletes:
+            crud.record_deletions(db, deletes)
+            db.execute(delete(v).where(v.id.in_(deletes)))
+        if updates:
+            _park_renamed(db, updates, existing)
+            # ORM bulk UPDATE by primary key; one executemany per set of changed columns.
+            db.execute(update(v), updates)
+        created_ids = []
+        if creates and db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            created_ids = list(db.scalars(insert(v).returning(v.id, sort_by_parameter_order=True), creates))
+        else:
+            # e.g. MySQL: no RETURNING, so one INSERT per entry to learn the ids.
+            created_ids = [db.execute(insert(v).values(**row)).inserted_primary_key[0] for row in creates]
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise BatchError(409, f"Batch conflicts with a concurrent change: {e.orig}", [])
+
+    created = iter(created_ids)
+    status = {"create": "created", "update": "updated", "delete": "deleted"}
+    return [
+        {"index": i, "op": op.op, "id": next(created) if op.op == "create" else op.id, "status": status[op.op]}
+        for i, op in enumerate(operations)
+    ]
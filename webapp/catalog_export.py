@@ -0,0 +1,126 @@
+"""Streaming export of the vulnerability catalog (XLSX, CSV, JSON Lines).
+
+Rows are read with ``yield_per`` so only one batch is in memory at a time.
+CSV and JSONL are written line by line as the response streams; XLSX goes
+through an openpyxl write-only workbook (rows are flushed to a temporary
+file as they are appended) into a spooled file that is then streamed. The
+column layout is the one /vulnerabilities/upload_excel/ accepts, so an
+exported sheet can be imported elsewhere as is.
+"""
+from datetime import datetime
+import csv
+import io
+import json
+import os
+import tempfile
+
+from sqlalchemy import select
+
+from webapp import models
+from webapp.catalog_import import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+from webapp.database import SessionLocal
+
+EXPORT_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+EXPORT_BATCH_ROWS = int(os.environ.get("DVA_EXPORT_BATCH_ROWS", "1000"))
+# Finished workbooks up to this size stay in memory, larger ones on disk.
+EXPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
+# format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (".csv", "text/csv; charset=utf-8"),
+    "jsonl": (".jsonl", "application/x-ndjson"),
+}
+
+
+def _catalog_rows(db):
+    v = models.Vulnerability
+    query = select(*(getattr(v, name) for name in EXPORT_COLUMNS)).order_by(v.id)
+    for row in db.execute(query.execution_options(yield_per=EXPORT_BATCH_ROWS)):
+        yield ["" if value is None else value for value in row]
+
+
+def _batched_text(rows, write_row):
+    """Encode rows in chunks of EXPORT_BATCH_ROWS, so the response isn't one write per row."""
+    buffer = io.StringIO()
+    for i, row in enumerate(rows, 1):
+        write_row(buffer, row)
+        if i % EXPORT_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _iter_csv(db):
+    def write_row(buffer, row):
+        csv.writer(buffer).writerow(row)
+
+    # The BOM makes Excel pick UTF-8 when opening the file.
+    yield b"\xef\xbb\xbf"
+    yield from _batched_text([EXPORT_COLUMNS], write_row)
+    yield from _batched_text(_catalog_rows(db), write_row)
+
+
+def _iter_jsonl(db):
+    def write_row(buffer, row):
+        buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+        buffer.write("\n")
+
+    yield from _batched_text(_catalog_rows(db), write_row)
+
+
+def _iter_xlsx(db, chunk_size=1024 * 1024):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def cell(value):
+        if not isinstance(value, str):
+            return value
+        value = ILLEGAL_CHARACTERS_RE.sub("", value)
+        if not value.startswith("="):
+            return value
+        # Catalog text, not a formula.
+        text_cell = WriteOnlyCell(sheet, value)
+        text_cell.data_type = "s"
+        return text_cell
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("vulnerabilities")
+    sheet.append(EXPORT_COLUMNS)
+    for row in _catalog_rows(db):
+        sheet.append([cell(value) for value in row])
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    try:
+        workbook.save(buffer)
+        buffer.seek(0)
+        while True:
+            chunk = buffer.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        buffer.close()
+
+
+_WRITERS = {"xlsx": _iter_xlsx, "csv": _iter_csv, "jsonl": _iter_jsonl}
+
+
+def export_filename(fmt):
+    return f"vulnerability_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[fmt][0]}"
+
+
+def iter_catalog_export(fmt):
+    """Yield the catalog as ``fmt`` bytes.
+
+    Uses its own session: the response body is produced after the
+    request's dependencies have been torn down.
+    """
+    db = SessionLocal()
+    try:
+        yield from _WRITERS[fmt](db)
+    finally:
+        db.close()
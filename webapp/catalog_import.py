@@ -0,0 +1,202 @@
+"""Bulk import of vulnerability catalog entries from an Excel sheet.
+
+The sheet is streamed with openpyxl's read-only mode, existing entries are
+matched through a single case-folded title index, and inserts/updates are
+written as executemany batches, one transaction per chunk. Runs on a
+worker thread (the upload endpoint is a sync route), never on the event
+loop.
+"""
+from zipfile import BadZipFile
+import os
+import time
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from webapp import crud, models
+
+REQUIRED_COLUMNS = ["title", "severity", "description", "recommendation", "reference"]
+# Imported when the sheet has them, otherwise left empty on new entries.
+OPTIONAL_COLUMNS = ["cvss_score", "cvss_vector", "evidence"]
+
+IMPORT_CHUNK_ROWS = int(os.environ.get("DVA_IMPORT_CHUNK_ROWS", "1000"))
+# Per-row diagnostics beyond this many are only counted.
+MAX_DIAGNOSTICS = int(os.environ.get("DVA_IMPORT_MAX_DIAGNOSTICS", "1000"))
+
+
+class SheetFormatError(ValueError):
+    """The upload isn't a readable .xlsx or lacks required columns."""
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_sheet(fileobj):
+    """Return ``(columns, rows)`` of the first worksheet.
+
+    ``rows`` lazily yields ``(sheet row number, {column: str})``; blank
+    rows are left out.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (InvalidFileException, BadZipFile, KeyError) as e:
+        raise SheetFormatError(f"Not a readable .xlsx file: {e}")
+    values = workbook.worksheets[0].iter_rows(values_only=True)
+    header = [_cell(name).lower() for name in next(values, ())]
+    for col in REQUIRED_COLUMNS:
+        if col not in header:
+            workbook.close()
+            raise SheetFormatError(f"Missing column: {col}")
+    positions = {name: header.index(name) for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if name in header}
+
+    def rows():
+        try:
+            for number, row in enumerate(values, 2):
+                if not any(value is not None and str(value).strip() for value in row):
+                    continue
+                yield number, {
+                    name: _cell(row[pos]) if pos < len(row) else ""
+                    for name, pos in positions.items()
+                }
+        finally:
+            workbook.close()
+
+    return list(positions), rows()
+
+
+class _Import:
+    def __init__(self, db):
+        self.db = db
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0, "invalid": 0, "failed": 0}
+        self.diagnostics = []
+        self.diagnostics_total = 0
+        self.inserts = []
+        self.updates = []
+        self.chunks = 0
+        self.write_seconds = 0.0
+
+    def note(self, number, title, status, reason):
+        self.counts[status] += 1
+        self.diagnostics_total += 1
+        if len(self.diagnostics) < MAX_DIAGNOSTICS:
+            self.diagnostics.append({"row": number, "title": title, "status": status, "reason": reason})
+
+    def pending(self):
+        return len(self.inserts) + len(self.updates)
+
+    def flush(self):
+        if not self.pending():
+            return
+        started = time.perf_counter()
+        try:
+            crud.bump_catalog_version(self.db)
+            if self.inserts:
+                self.db.execute(insert(models.Vulnerability), [values for _, _, values in self.inserts])
+            if self.updates:
+                self.db.execute(update(models.Vulnerability), [values for _, _, values in self.updates])
+            self.db.commit()
+            self.counts["inserted"] += len(self.inserts)
+            self.counts["updated"] += len(self.updates)
+        except IntegrityError:
+            # Usually an entry created concurrently under the same title;
+            # redo the chunk row by row to pin down the offending rows.
+            self.db.rollback()
+            self._flush_rows()
+        self.chunks += 1
+        self.inserts, self.updates = [], []
+        self.write_seconds += time.perf_counter() - started
+
+    def _flush_rows(self):
+        for status, statement, batch in (
+            ("inserted", insert(models.Vulnerability), self.inserts),
+            ("updated", update(models.Vulnerability), self.updates),
+        ):
+            for number, title, values in batch:
+                try:
+                    crud.bump_catalog_version(self.db)
+                    self.db.execute(statement, [values])
+                    self.db.commit()
+                    self.counts[status] += 1
+                except IntegrityError as e:
+                    self.db.rollback()
+                    self.note(number, title, "failed", str(e.orig))
+
+
+def import_catalog(db, fileobj):
+    """Insert or update catalog entries from an .xlsx file object.
+
+    Rows are matched to existing entries by case-insensitive title. Returns
+    the counts (``skipped`` covers unchanged, invalid and failed rows, as
+    before), per-row ``diagnostics`` for invalid and failed rows, and
+    throughput ``stats``.
+    """
+    started = time.perf_counter()
+    columns, rows = read_sheet(fileobj)
+    compared = [name for name in columns if name != "title"]
+    missing_optional = [name for name in OPTIONAL_COLUMNS if name not in columns]
+    job = _Import(db)
+
+    v = models.Vulnerability
+    existing = {}
+    for entry in db.execute(select(v.id, v.title, *(getattr(v, name) for name in compared))):
+        if entry.title:
+            existing.setdefault(entry.title.strip().casefold(), entry)
+    index_seconds = time.perf_counter() - started
+
+    seen = {}
+    total_rows = 0
+    for number, row in rows:
+        total_rows += 1
+        title = row["title"]
+        if not title or not row["severity"]:
+            job.note(number, title, "invalid", "title and severity are required")
+            continue
+        key = title.casefold()
+        if key in seen:
+            job.note(number, title, "invalid", f"duplicate title, row {seen[key]} is used")
+            continue
+        seen[key] = number
+
+        current = existing.get(key)
+        values = {name: row[name] for name in compared}
+        if current is None:
+            job.inserts.append((number, title, dict(values, title=title, **{name: "" for name in missing_optional})))
+        elif any((getattr(current, name) or "") != values[name] for name in compared):
+            job.updates.append((number, title, dict(values, id=current.id)))
+        else:
+            job.counts["unchanged"] += 1
+
+        if job.pending() >= IMPORT_CHUNK_ROWS:
+            job.flush()
+    job.flush()
+
+    seconds = time.perf_counter() - started
+    counts = job.counts
+    skipped = counts["unchanged"] + counts["invalid"] + counts["failed"]
+    return {
+        "inserted": counts["inserted"],
+        "updated": counts["updated"],
+        "skipped": skipped,
+        "unchanged": counts["unchanged"],
+        "invalid": counts["invalid"],
+        "failed": counts["failed"],
+        "diagnostics": job.diagnostics,
+        "diagnostics_truncated": job.diagnostics_total > len(job.diagnostics),
+        "stats": {
+            "rows": total_rows,
+            "chunks": job.chunks,
+            "seconds": round(seconds, 3),
+            "index_seconds": round(index_seconds, 3),
+            "write_seconds": round(job.write_seconds, 3),
+            "rows_per_second": round(total_rows / seconds) if seconds else None,
+        },
+        "message": f"✅ Upload complete. Inserted: {counts['inserted']}, Updated: {counts['updated']}, Skipped: {skipped}",
+    }
@@ -0,0 +1,71 @@
+from collections import Counter
+from functools import lru_cache
+from io import BytesIO
+import os
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+SEVERITY_ORDER = ["Critical", "High", "Medium", "Low"]
+SEVERITY_CHART_COLORS = {
+    "Critical": "maroon",
+    "High": "red",
+    "Medium": "orange",
+    "Low": "green"
+}
+
+CHART_CACHE_SIZE = int(os.environ.get("DVA_CHART_CACHE_SIZE", "128"))
+
+
+def severity_counts(vulns):
+    """Return the per-severity counts as a tuple ordered like SEVERITY_ORDER."""
+    counts = Counter(v.severity for v in vulns)
+    return tuple(counts[sev] for sev in SEVERITY_ORDER)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def render_severity_chart(counts):
+    """Render the severity pie chart for ``counts`` and return PNG bytes.
+
+    Uses a private Figure/Agg canvas instead of the pyplot state machine, so
+    concurrent reports on different threads never share a figure. Results
+    are memoized on the counts tuple; callers must treat the bytes as
+    read-only.
+    """
+    labels = [sev for sev, n in zip(SEVERITY_ORDER, counts) if n > 0]
+    sizes = [n for n in counts if n > 0]
+    colors = [SEVERITY_CHART_COLORS[sev] for sev in labels]
+    total = sum(sizes)
+
+    def _autopct(pct):
+        val = int(round(pct * total / 100.0))
+        return f"{val}" if val > 0 else ""
+
+    fig = Figure(figsize=(4, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if sizes:
+        _, _, autotexts = ax.pie(
+            sizes,
+            labels=labels,
+            colors=colors,
+            autopct=_autopct,
+            startangle=140
+        )
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontsize(10)
+            autotext.set_weight("bold")
+
+        patches = [
+            Patch(color=SEVERITY_CHART_COLORS[sev], label=f"{n} {sev}")
+            for sev, n in zip(labels, sizes)
+        ]
+        ax.legend(handles=patches, loc="best")
+    ax.axis('equal')
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
@@ -1,18 +1,232 @@
+from datetime import datetime
+import json
+import uuid
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from webapp import models, schemas
 from webapp.routers import vulnerabilities, report
 from webapp.database import engine, Base
 
 
+VULNERABILITY_FIELDS = (
+    "id", "title", "severity", "cvss_score", "cvss_vector",
+    "description", "evidence", "recommendation", "reference"
+)
+
+def _severity_rank():
+    v = models.Vulnerability
+    return case(
+        (v.severity == "Critical", 0), (v.severity == "High", 1),
+        (v.severity == "Medium", 2), (v.severity == "Low", 3),
+        else_=4
+    )
+
+# Sort keys for list_vulnerabilities; id breaks ties so the keyset is unique.
+VULNERABILITY_SORTS = {
+    "id": lambda: models.Vulnerability.id,
+    "title": lambda: func.coalesce(models.Vulnerability.title, ""),
+    "severity": _severity_rank,
+}
+
 def get_vulnerabilities(db: Session):
     return db.query(models.Vulnerability).all()
 
+def _list_query(fields, sort, descending, severities, search, after, limit):
+    v = models.Vulnerability
+    sort_key = VULNERABILITY_SORTS[sort]()
+    columns = [getattr(v, name) for name in fields]
+    query = select(*columns, sort_key.label("_sort"), v.id.label("_id"))
+
+    if severities:
+        query = query.where(v.severity.in_(severities))
+    if search:
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.where(v.title.ilike(pattern, escape="\\"))
+    if after is not None:
+        after_sort, after_id = after
+        if descending:
+            query = query.where(or_(sort_key < after_sort, and_(sort_key == after_sort, v.id < after_id)))
+        else:
+            query = query.where(or_(sort_key > after_sort, and_(sort_key == after_sort, v.id > after_id)))
+
+    if descending:
+        query = query.order_by(sort_key.desc(), v.id.desc())
+    else:
+        query = query.order_by(sort_key, v.id)
+    if limit is not None:
+        # One extra row tells whether there is a next page.
+        query = query.limit(limit + 1)
+    return query
+
+def _list_page(rows, fields, limit):
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1]._sort, rows[-1]._id)
+    return [{name: row._mapping[name] for name in fields} for row in rows], next_key
+
+def list_vulnerabilities(
+    db: Session,
+    fields=VULNERABILITY_FIELDS,
+    sort="id",
+    descending=False,
+    severities=None,
+    search=None,
+    after=None,
+    limit=None
+):
+    """Keyset-paginated catalog listing that only selects ``fields``.
+
+    ``after`` is the ``(sort value, id)`` of the last row of the previous
+    page. Returns ``(rows, next_key)`` where rows are dicts and
+    ``next_key`` is None on the last page.
+    """
+    query = _list_query(fields, sort, descending, severities, search, after, limit)
+    return _list_page(db.execute(query).all(), fields, limit)
+
+async def list_vulnerabilities_async(
+    db: AsyncSession,
+    fields=VULNERABILITY_FIELDS,
+    sort="id",
+    descending=False,
+    severities=None,
+    search=None,
+    after=None,
+    limit=None
+):
+    """list_vulnerabilities on an AsyncSession."""
+    query = _list_query(fields, sort, descending, severities, search, after, limit)
+    return _list_page((await db.execute(query)).all(), fields, limit)
+
 def get_vulnerability(db: Session, vuln_id: int):
     return db.query(models.Vulnerability).filter(models.Vulnerability.id == vuln_id).first()
 
+async def get_vulnerability_async(db: AsyncSession, vuln_id: int):
+    return await db.get(models.Vulnerability, vuln_id)
+
 def create_vulnerability(db: Session, vuln: schemas.VulnerabilityCreate):
+    bump_catalog_version(db)
     db_vuln = models.Vulnerability(**vuln.dict())
     db.add(db_vuln)
     db.commit()
     db.refresh(db_vuln)
     return db_vuln
+
+# Last-Modified of a catalog that has no version row yet.
+CATALOG_EPOCH = datetime(2000, 1, 1)
+
+def _now():
+    # Whole seconds, the resolution of Last-Modified.
+    return datetime.utcnow().replace(microsecond=0)
+
+def ensure_catalog_version(db: Session):
+    """Create the catalog version row if missing (see webapp.database.init_db)."""
+    if db.get(models.CatalogVersion, 1) is None:
+        try:
+            db.add(models.CatalogVersion(id=1, version=1, updated_at=_now()))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+def get_catalog_version(db: Session):
+    """Return ``(version, updated_at)`` of the vulnerability catalog.
+
+    Read-only, so it never waits for a writer's lock.
+    """
+    return _catalog_version(db.get(models.CatalogVersion, 1))
+
+async def get_catalog_version_async(db: AsyncSession):
+    return _catalog_version(await db.get(models.CatalogVersion, 1))
+
+def _catalog_version(row):
+    if row is None:
+        return 1, CATALOG_EPOCH
+    return row.version, row.updated_at
+
+def bump_catalog_version(db: Session):
+    """Record a catalog change; call before the writes it belongs to.
+
+    Inserted and updated entries take the new version as their revision
+    (see models.Vulnerability.revision), so it has to be bumped first.
+    """
+    updated = db.query(models.CatalogVersion).filter(models.CatalogVersion.id == 1).update({
+        "version": models.CatalogVersion.version + 1,
+        "updated_at": _now()
+    }, synchronize_session=False)
+    if not updated:
+        db.add(models.CatalogVersion(id=1, version=2, updated_at=_now()))
+
+def record_deletions(db: Session, ids):
+    """Leave tombstones for catalog entries about to be deleted (after bump_catalog_version)."""
+    t = models.VulnerabilityTombstone
+    if ids:
+        # An id can come back (SQLite reuses the highest one) and be deleted again.
+        db.execute(delete(t).where(t.id.in_(ids)))
+        db.execute(insert(t), [{"id": vuln_id} for vuln_id in ids])
+
+def _changes_queries(since, version, fields):
+    v, t = models.Vulnerability, models.VulnerabilityTombstone
+    changed = select(*(getattr(v, name) for name in fields)) \
+        .where(v.revision > since, v.revision <= version).order_by(v.revision, v.id)
+    deleted = select(t.id).where(t.revision > since, t.revision <= version).order_by(t.id)
+    return changed, deleted
+
+def _changes(version, changed_rows, deleted_ids):
+    changed = [dict(row._mapping) for row in changed_rows]
+    # A deleted id that was reused by a newer entry is not a deletion for the client.
+    live = {row["id"] for row in changed}
+    return {"revision": version, "changed": changed, "deleted": [i for i in deleted_ids if i not in live]}
+
+def get_changes(db: Session, since: int, fields=VULNERABILITY_FIELDS):
+    """Catalog deltas after revision ``since``, up to the current version.
+
+    Returns ``{"revision", "changed", "deleted"}``: entries (``fields``)
+    written since, and ids deleted since. Clients apply ``deleted``, then
+    upsert ``changed``, and ask again with ``since=revision``.
+    """
+    version, _ = get_catalog_version(db)
+    changed, deleted = _changes_queries(since, version, fields)
+    return _changes(version, db.execute(changed), db.scalars(deleted).all())
+
+async def get_changes_async(db: AsyncSession, since: int, fields=VULNERABILITY_FIELDS):
+    version, _ = await get_catalog_version_async(db)
+    changed, deleted = _changes_queries(since, version, fields)
+    return _changes(version, await db.execute(changed), (await db.scalars(deleted)).all())
+
+def create_draft(db: Session, data: dict):
+    draft = models.ReportDraft(id=uuid.uuid4().hex, version=1, data=json.dumps(data))
+    db.add(draft)
+    db.commit()
+    db.refresh(draft)
+    return draft
+
+def get_draft(db: Session, draft_id: str):
+    return db.query(models.ReportDraft).filter(models.ReportDraft.id == draft_id).first()
+
+def update_draft(db: Session, draft_id: str, data: dict, expected_version: int):
+    """Store ``data`` if the draft is still at ``expected_version``; False if it moved on."""
+    updated = db.query(models.ReportDraft).filter(
+        models.ReportDraft.id == draft_id,
+        models.ReportDraft.version == expected_version
+    ).update({
+        "data": json.dumps(data),
+        "version": expected_version + 1,
+        "updated_at": datetime.utcnow()
+    }, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+def delete_draft(db: Session, draft_id: str):
+    deleted = db.query(models.ReportDraft).filter(models.ReportDraft.id == draft_id).delete()
+    db.commit()
+    return deleted == 1
+
+def delete_expired_drafts(db: Session, older_than: datetime):
+    """Delete drafts last saved before ``older_than``; returns how many went."""
+    deleted = db.query(models.ReportDraft).filter(
+        models.ReportDraft.updated_at < older_than
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
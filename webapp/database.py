@@ -1,10 +1,147 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Update this with your actual DB string
-SQLALCHEMY_DATABASE_URL = "sqlite:///./dva.db"
+# Any SQLAlchemy URL, e.g. postgresql+psycopg://dva:secret@db/dva; SQLite by default.
+SQLALCHEMY_DATABASE_URL = os.environ.get("DVA_DATABASE_URL", "sqlite:///./dva.db")
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+POOL_SIZE = int(os.environ.get("DVA_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.environ.get("DVA_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.environ.get("DVA_DB_POOL_TIMEOUT", "30"))
+# Server databases drop idle connections; recycle them before that happens.
+POOL_RECYCLE = int(os.environ.get("DVA_DB_POOL_RECYCLE", "1800"))
+
+# WAL lets catalog reads continue while an import holds the write lock;
+# with WAL, synchronous=NORMAL is still safe against corruption and only
+# risks the last commits on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("DVA_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("DVA_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(float(os.environ.get("DVA_SQLITE_BUSY_TIMEOUT", "30")) * 1000),
+    # Negative cache_size is in KiB.
+    "cache_size": -int(float(os.environ.get("DVA_SQLITE_CACHE_MB", "64")) * 1024),
+    "mmap_size": int(float(os.environ.get("DVA_SQLITE_MMAP_MB", "256")) * 1024 * 1024),
+    "temp_store": "MEMORY",
+}
+
+
+def _engine_options():
+    if IS_SQLITE and SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory databases live in one connection; keep SQLAlchemy's default pool.
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_pre_ping": not IS_SQLITE,
+    }
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000}
+    else:
+        options["pool_recycle"] = POOL_RECYCLE
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
+
+# Async drivers for the catalog read endpoints, by sync URL scheme.
+ASYNC_DRIVERS = {"sqlite": ("sqlite+aiosqlite", "aiosqlite"), "postgresql": ("postgresql+asyncpg", "asyncpg")}
+
+
+def _async_url():
+    if os.environ.get("DVA_ASYNC_DATABASE_URL"):
+        return os.environ["DVA_ASYNC_DATABASE_URL"]
+    scheme, _, rest = SQLALCHEMY_DATABASE_URL.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if driver is None:
+        return None
+    try:
+        __import__(driver[1])
+    except ImportError:
+        return None
+    return f"{driver[0]}://{rest}"
+
+
+def _create_async_engine():
+    # Opt-in: on SQLite the sync threadpool path measured faster
+    # (python -m benchmarks.catalog_load).
+    if os.environ.get("DVA_ASYNC_DB", "false").lower() not in ("1", "true", "yes", "on"):
+        return None
+    url = _async_url()
+    if IS_SQLITE and SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+        # A second engine would open a different, empty in-memory database.
+        url = None
+    if url is None:
+        raise RuntimeError(f"DVA_ASYNC_DB is set but there is no async driver for {SQLALCHEMY_DATABASE_URL}")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options = _engine_options()
+    if IS_SQLITE:
+        # aiosqlite runs each connection in its own thread already.
+        options.setdefault("connect_args", {}).pop("check_same_thread", None)
+    async_engine = create_async_engine(url, **options)
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+
+async_engine = _create_async_engine()
+AsyncSessionLocal = None
+if async_engine is not None:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _add_missing_columns(engine):
+    """ALTER TABLE ... ADD COLUMN for model columns an older database lacks.
+
+    Only additions are handled: new columns must be nullable or have a
+    server default. Their indexes are created as well.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = [column for column in table.columns if column.name not in existing]
+            for column in added:
+                ddl = (f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                       f"{preparer.format_column(column)} {column.type.compile(engine.dialect)}")
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                print(f"🛠️ Added column {table.name}.{column.name}")
+            if added:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+
+def init_db():
+    """Create missing tables and columns (and the SQLite search index); safe to call repeatedly."""
+    from webapp import crud, models, search  # noqa: F401 -- registers the tables on Base
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    search.ensure_search_index(engine)
+    db = SessionLocal()
+    try:
+        crud.ensure_catalog_version(db)
+    finally:
+        db.close()
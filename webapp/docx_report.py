@@ -0,0 +1,192 @@
+"""DOCX back-end: lays out a ReportModel with python-docx."""
+from datetime import datetime
+from io import BytesIO
+import hashlib
+import os
+
+from webapp.memory import BOUNDED_BATCH_FINDINGS, check_memory, image_spool
+from webapp.report_model import FINDING_FIELDS, SEVERITY_ORDER
+from webapp.timing import StageTimer
+
+
+def _notify(progress, stage, fraction, timer=None):
+    if timer is not None:
+        timer.mark(stage)
+    if progress is not None:
+        progress(stage, fraction)
+
+def _image_fingerprint(image, renditions):
+    if not image.exists or image.full_path not in renditions:
+        return (image.clean_path, "missing")
+    rendition = renditions[image.full_path]
+    if rendition is None:
+        return (image.clean_path, "invalid")
+    return (image.clean_path, hashlib.sha1(rendition.data).hexdigest())
+
+def _render_finding_body(doc, finding, renditions, severity_colors, timer):
+    """Everything of a finding's section below its numbered heading."""
+    from docx.shared import Pt, RGBColor, Inches
+
+    para = doc.add_paragraph()
+    para.add_run("Severity: ").bold = True
+    sev_run = para.add_run(finding.severity)
+    sev_run.bold = True
+    sev_run.font.color.rgb = severity_colors.get(finding.severity, RGBColor(0, 0, 0))
+
+    doc.add_paragraph(f"CVSS Score: {finding.cvss_score}")
+    doc.add_paragraph(f"CVSS Vector: {finding.cvss_vector}")
+
+    doc.add_heading("Description", level=4).runs[0].font.size = Pt(18)
+    doc.add_paragraph(finding.description)
+
+    doc.add_heading("Evidence", level=4).runs[0].font.size = Pt(18)
+    for step_idx, step in enumerate(finding.steps, 1):
+        doc.add_paragraph(f"Step {step_idx}: {step.comment}")
+
+        for image in step.images:
+            if image.exists and image.full_path in renditions:
+                rendition = renditions[image.full_path]
+                try:
+                    if rendition is None:
+                        raise ValueError("undecodable image")
+                    with timer.measure("add_picture"):
+                        doc.add_picture(BytesIO(rendition.data), width=Inches(4))
+                except Exception:
+                    doc.add_paragraph(f"[Invalid image: {image.clean_path}]")
+            else:
+                doc.add_paragraph(f"[Image not found: {image.clean_path}]")
+
+    doc.add_heading("Recommendation", level=4).runs[0].font.size = Pt(18)
+    doc.add_paragraph(finding.recommendation)
+    doc.add_heading("Reference", level=4).runs[0].font.size = Pt(18)
+    doc.add_paragraph(finding.reference)
+
+def build_docx(model, progress=None, timer=None, spool=None):
+    """Assemble the DOCX for a ReportModel.
+
+    ``progress`` is an optional ``callable(stage, fraction)`` used by the
+    background job worker to publish how far rendering has got. ``timer``
+    is a StageTimer that receives the same stages plus finer measures.
+    With an ImageSpool (``spool``) the report is built in bounded-memory
+    mode, see webapp.memory.
+    """
+    # The rendering stack (python-docx, PIL, matplotlib) is imported on first
+    # use so workers that never build reports don't pay for it at startup.
+    # See webapp.warmup for pre-loading it in the background.
+    from docx.shared import Pt, RGBColor, Inches
+    from webapp.report_templates import get_template
+    from webapp.charts import render_severity_chart
+    from webapp.fragments import fragment_key, render_cached
+
+    timer = timer or StageTimer()
+    _notify(progress, "cover", 0.0, timer)
+    skeleton = get_template(model.template)
+    info = model.info
+    doc = skeleton.render({
+        "app_title": info.app_title,
+        "requester_name": info.requester_name,
+        "analyst_name": info.analyst_name,
+        "scope": info.scope,
+        "urls": info.urls,
+        "date": datetime.now().strftime("%d-%b-%Y"),
+    })
+
+    severity_colors = {
+        "Critical": RGBColor(128, 0, 0),
+        "High": RGBColor(255, 0, 0),
+        "Medium": RGBColor(255, 191, 0),
+        "Low": RGBColor(0, 128, 0)
+    }
+
+    _notify(progress, "chart", 0.05, timer)
+    pie_png = render_severity_chart(model.severity_counts())
+    doc.add_paragraph().add_run("Vulnerability Severity Distribution").bold = True
+    doc.add_picture(BytesIO(pie_png), width=Inches(4.5))
+    doc.paragraphs[-1].alignment = 1
+    doc.add_page_break()
+
+    _notify(progress, "summary", 0.1, timer)
+    doc.add_heading("Summary Table", level=2).runs[0].font.size = Pt(18)
+    summary_table = doc.add_table(rows=1, cols=4)
+    summary_table.style = 'Table Grid'
+    hdrs = ["Sl. No.", "Security Observation", "Risk Rating", "Page No."]
+    for i, h in enumerate(hdrs):
+        summary_table.cell(0, i).text = h
+
+    count = 1
+    page_counter = 4
+    for sev in SEVERITY_ORDER:
+        group = [f for f in model.findings if f.severity == sev]
+        if group:
+            row = summary_table.add_row().cells
+            row[0].merge(row[3])
+            heading = row[0].paragraphs[0].add_run(f"{sev} Severity")
+            heading.bold = True
+            heading.font.color.rgb = severity_colors[sev]
+            for f in group:
+                row = summary_table.add_row().cells
+                row[0].text = str(count)
+                row[1].text = f.title
+                risk = row[2].paragraphs[0].add_run(f.severity)
+                risk.font.color.rgb = severity_colors[f.severity]
+                row[3].text = str(page_counter)
+                count += 1
+                page_counter += 1
+
+    doc.add_page_break()
+    doc.add_heading("URLs and Scope", level=2).runs[0].font.size = Pt(18)
+    doc.add_paragraph(f"URLs: {info.urls}")
+    doc.add_paragraph(f"Scope: {info.scope}")
+    doc.add_page_break()
+
+    doc.add_heading("Vulnerability Details", level=2).runs[0].font.size = Pt(18)
+
+    # A no-op when the model's images were already prepared for another format.
+    _notify(progress, "images", 0.12, timer)
+    model.prepare_images()
+
+    total = len(model.findings) or 1
+    for finding in model.findings:
+        idx = finding.index
+        _notify(progress, "findings", 0.15 + 0.8 * (idx - 1) / total, timer)
+        if (idx - 1) % BOUNDED_BATCH_FINDINGS == 0:
+            renditions = model.images_for(model.findings[idx - 1:idx - 1 + BOUNDED_BATCH_FINDINGS])
+        doc.add_page_break()
+        doc.add_heading(f"{idx}. {finding.title}", level=3).runs[0].font.size = Pt(18)
+
+        key = fragment_key(
+            skeleton.key,
+            {name: getattr(finding, name) for name in FINDING_FIELDS},
+            [
+                (step.comment, [_image_fingerprint(image, renditions) for image in step.images])
+                for step in finding.steps
+            ]
+        )
+        with timer.measure("finding"):
+            hit = render_cached(
+                doc, key,
+                lambda: _render_finding_body(doc, finding, renditions, severity_colors, timer),
+                store=spool is None
+            )
+        timer.count("fragment_hit" if hit else "fragment_miss")
+        if spool is not None:
+            spool.spool(doc)
+        check_memory()
+
+    return doc
+
+def render_docx(model, target, progress=None, timer=None):
+    """Render ``model`` into ``target``, a file path or writable binary stream."""
+    timer = timer or StageTimer()
+    with image_spool(model.bounded) as spool:
+        doc = build_docx(model, progress, timer, spool)
+        _notify(progress, "saving", 0.95, timer)
+        if spool is not None:
+            spool.spool(doc)
+            timer.count("spooled_images", spool.spooled)
+        if isinstance(target, str):
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        doc.save(target)
+    _notify(progress, "done", 1.0)
+    timer.stop()
+    return target
@@ -0,0 +1,114 @@
+"""Cached per-finding DOCX fragments.
+
+Analysts regenerate the same report many times while editing evidence.
+Each finding's Severity/Description/Evidence/Recommendation section is
+cached as serialized body XML (plus the images it references), keyed by a
+hash of everything that affects its rendering. On regeneration unchanged
+findings are spliced back into the new document and only edited ones are
+rendered again.
+"""
+from collections import namedtuple
+import hashlib
+import json
+import os
+import weakref
+
+from webapp.cache import SizedLRUCache
+
+FRAGMENT_CACHE_BYTES = int(float(os.environ.get("DVA_FRAGMENT_CACHE_MB", "256")) * 1024 * 1024)
+
+# ``elements`` are serialized w:p/w:tbl elements, ``images`` maps the rId
+# used in them to the embedded image bytes.
+Fragment = namedtuple("Fragment", "elements images")
+
+
+def _fragment_size(fragment):
+    return sum(len(x) for x in fragment.elements) + sum(len(b) for b in fragment.images.values())
+
+
+fragment_cache = SizedLRUCache(FRAGMENT_CACHE_BYTES, sizeof=_fragment_size)
+
+# Per-document {sha1: rId} of images spliced in from fragments.
+# python-docx's own de-duplication re-hashes every image part on every
+# insert, which is quadratic in the number of screenshots.
+_image_rids = weakref.WeakKeyDictionary()
+
+
+def fragment_key(*parts):
+    """Stable hash of JSON-serializable ``parts``."""
+    data = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _content_end(body):
+    # New content always goes before the trailing w:sectPr.
+    return len(body) - 1 if body.sectPr is not None else len(body)
+
+
+def render_cached(doc, key, render, store=True):
+    """Append the fragment for ``key`` to ``doc``, calling ``render()`` on a miss.
+
+    ``render`` must only append to the end of the document body. With
+    ``store=False`` a miss is rendered but not cached. Returns True when the
+    fragment came from the cache.
+    """
+    from docx.oxml.ns import qn
+    from lxml import etree
+
+    fragment = fragment_cache.get(key)
+    if fragment is not None:
+        _insert_fragment(doc, fragment)
+        return True
+
+    body = doc.element.body
+    start = _content_end(body)
+    render()
+    if not store:
+        return False
+    new_elements = list(body)[start:_content_end(body)]
+
+    images = {}
+    for el in new_elements:
+        for blip in el.iter(qn("a:blip")):
+            rid = blip.get(qn("r:embed"))
+            if rid and rid not in images:
+                images[rid] = doc.part.related_parts[rid].blob
+    fragment_cache.put(key, Fragment([etree.tostring(el) for el in new_elements], images))
+    return False
+
+
+def _image_rid(doc, blob):
+    from docx.image.image import Image
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    index = _image_rids.setdefault(doc.part, {})
+    digest = hashlib.sha1(blob).hexdigest()
+    rid = index.get(digest)
+    if rid is None:
+        image_part = doc.part.package.image_parts._add_image_part(Image.from_blob(blob))
+        rid = doc.part.relate_to(image_part, RT.IMAGE)
+        index[digest] = rid
+    return rid
+
+
+def _insert_fragment(doc, fragment):
+    from docx.oxml.ns import qn
+    from docx.oxml.parser import parse_xml
+
+    rid_map = {old: _image_rid(doc, blob) for old, blob in fragment.images.items()}
+    # Drawing ids must stay unique within the document.
+    next_id = doc.part.next_id if fragment.images else None
+
+    body = doc.element.body
+    sect_pr = body.sectPr
+    for xml in fragment.elements:
+        el = parse_xml(xml)
+        for blip in el.iter(qn("a:blip")):
+            blip.set(qn("r:embed"), rid_map[blip.get(qn("r:embed"))])
+        for doc_pr in el.iter(qn("wp:docPr")):
+            doc_pr.set("id", str(next_id))
+            next_id += 1
+        if sect_pr is not None:
+            sect_pr.addprevious(el)
+        else:
+            body.append(el)
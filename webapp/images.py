@@ -0,0 +1,214 @@
+"""Evidence image optimization for DOCX embedding.
+
+Screenshots are embedded in a fixed 4-inch slot, so anything wider than
+``SLOT_WIDTH_INCHES * dpi`` pixels is wasted space in the .docx. Each image
+is downsampled to the target DPI, re-encoded to PNG or JPEG (whichever is
+smaller; BMP/GIF/TIFF/AVIF are always converted) and the rendition is cached
+by content hash, so regenerating a report doesn't redo the work.
+
+Images are read, decoded and encoded concurrently on a shared, bounded
+thread pool (Pillow releases the GIL while decoding/resizing) before the
+document is assembled.
+"""
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import hashlib
+import os
+import threading
+
+from PIL import Image as PILImage
+
+from webapp.cache import SizedLRUCache
+
+SLOT_WIDTH_INCHES = 4.0
+
+# Successively cheaper (dpi, jpeg quality) settings. Reports normally use the
+# first one; a report size budget walks down the list until the images fit.
+QUALITY_LEVELS = [
+    (int(os.environ.get("DVA_IMAGE_DPI", "200")), 85),
+    (150, 75),
+    (110, 65),
+    (80, 50),
+]
+
+# PNG/JPEG files already within the slot and below this size are embedded as-is.
+PASSTHROUGH_BYTES = 512 * 1024
+
+# Space reserved for everything that isn't evidence when applying a budget.
+NON_IMAGE_ALLOWANCE_BYTES = 512 * 1024
+
+IMAGE_CACHE_BYTES = int(float(os.environ.get("DVA_IMAGE_CACHE_MB", "256")) * 1024 * 1024)
+
+# Shared by all requests, so concurrent reports can't oversubscribe the CPU.
+IMAGE_WORKERS = int(os.environ.get("DVA_IMAGE_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+# Content hashes of files that failed to decode, so they aren't retried.
+INVALID_CACHE_ENTRIES = 4096
+
+Rendition = namedtuple("Rendition", "data format width height")
+
+rendition_cache = SizedLRUCache(IMAGE_CACHE_BYTES, sizeof=lambda r: len(r.data))
+
+_invalid_images = OrderedDict()
+_invalid_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="evidence-image")
+        return _executor
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _encode(img, fmt, quality):
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        img.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def optimize_image_bytes(raw, dpi, quality):
+    """Return a Rendition of ``raw`` sized for the evidence slot at ``dpi``.
+
+    Raises if the data isn't a decodable image.
+    """
+    with PILImage.open(BytesIO(raw)) as img:
+        src_format = img.format
+        img.load()
+        max_width = int(SLOT_WIDTH_INCHES * dpi)
+        resized = img.width > max_width
+
+        if src_format in ("PNG", "JPEG") and not resized and len(raw) <= PASSTHROUGH_BYTES:
+            return Rendition(raw, src_format, img.width, img.height)
+
+        if img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+        if resized:
+            height = max(1, round(img.height * max_width / img.width))
+            img = img.resize((max_width, height), PILImage.LANCZOS)
+
+        if src_format == "JPEG" and not _has_alpha(img):
+            return Rendition(_encode(img, "JPEG", quality), "JPEG", img.width, img.height)
+
+        data, fmt = _encode(img, "PNG", quality), "PNG"
+        if not _has_alpha(img) and len(data) > PASSTHROUGH_BYTES:
+            jpeg = _encode(img, "JPEG", quality)
+            if len(jpeg) < len(data):
+                data, fmt = jpeg, "JPEG"
+        return Rendition(data, fmt, img.width, img.height)
+
+
+def optimized_image(path, level=0, cache=True):
+    """Return the cached (or freshly built) Rendition of the image at ``path``.
+
+    With ``cache=False`` a freshly built rendition isn't kept.
+    """
+    dpi, quality = QUALITY_LEVELS[level]
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    with _invalid_lock:
+        error = _invalid_images.get(digest)
+    if error is not None:
+        raise InvalidImageError(error)
+
+    key = (digest, dpi, quality)
+    rendition = rendition_cache.get(key)
+    if rendition is None:
+        try:
+            rendition = optimize_image_bytes(raw, dpi, quality)
+        except Exception as e:
+            with _invalid_lock:
+                _invalid_images[digest] = str(e)
+                while len(_invalid_images) > INVALID_CACHE_ENTRIES:
+                    _invalid_images.popitem(last=False)
+            raise InvalidImageError(str(e)) from e
+        if cache:
+            rendition_cache.put(key, rendition)
+    return rendition
+
+
+def is_image_file(path):
+    """True if ``path`` is an image Pillow can identify and verify."""
+    try:
+        with PILImage.open(path) as img:
+            img.verify()
+        return True
+    except Exception:
+        return False
+
+
+def _try_optimized_image(path, level, cache=True):
+    try:
+        return optimized_image(path, level, cache)
+    except Exception as e:
+        print(f"⚠️ Could not prepare evidence image {path}: {e}")
+        return None
+
+
+def _image_budget(max_report_bytes):
+    if not max_report_bytes:
+        return None
+    return max(max_report_bytes - NON_IMAGE_ALLOWANCE_BYTES, 0)
+
+
+def choose_quality_level(paths, max_report_bytes=None, cache=True):
+    """Return the first QUALITY_LEVELS index at which ``paths`` fit the budget.
+
+    Unlike prepare_evidence_images this only keeps running totals, so it can
+    be used on reports whose renditions don't fit in memory together.
+    """
+    budget = _image_budget(max_report_bytes)
+    if budget is None:
+        return 0
+    paths = list(dict.fromkeys(paths))
+    executor = _get_executor()
+    for level in range(len(QUALITY_LEVELS) - 1):
+        results = executor.map(_try_optimized_image, paths, [level] * len(paths), [cache] * len(paths))
+        total = sum(len(r.data) for r in results if r is not None)
+        if total <= budget:
+            return level
+        print(f"📉 Evidence images use {total} bytes, over the {budget} byte budget; lowering quality")
+    return len(QUALITY_LEVELS) - 1
+
+
+def prepare_evidence_images(paths, max_report_bytes=None, level=None, cache=True):
+    """Optimize every image in ``paths`` for embedding.
+
+    Returns ``{path: Rendition or None}``; None marks an image that could not
+    be decoded. With ``max_report_bytes`` the quality level is lowered until
+    the images fit the budget (or the cheapest level is reached); ``level``
+    forces a QUALITY_LEVELS index instead. ``cache=False`` leaves the
+    rendition cache as it is.
+    """
+    paths = list(dict.fromkeys(paths))
+    budget = _image_budget(max_report_bytes)
+
+    executor = _get_executor()
+    renditions = {}
+    levels = range(len(QUALITY_LEVELS)) if level is None else [level]
+    for level in levels:
+        results = executor.map(_try_optimized_image, paths, [level] * len(paths), [cache] * len(paths))
+        renditions = dict(zip(paths, results))
+
+        total = sum(len(r.data) for r in renditions.values() if r is not None)
+        if budget is None or total <= budget:
+            break
+        if level + 1 < len(QUALITY_LEVELS):
+            print(f"📉 Evidence images use {total} bytes, over the {budget} byte budget; lowering quality")
+    return renditions
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# The queue lives next to the generated reports so every backend/worker
+# container that mounts ./generated_reports sees the same jobs.
+JOBS_DB_PATH = os.environ.get("DVA_JOBS_DB", os.path.join("generated_reports", "jobs.db"))
+
+# A running job whose worker has not sent a heartbeat for this long is
+# considered abandoned (worker crashed / container stopped) and is re-queued.
+LEASE_SECONDS = int(os.environ.get("DVA_JOB_LEASE_SECONDS", "120"))
+# Workers renew their lease this often while a job runs (webapp.worker).
+HEARTBEAT_SECONDS = max(LEASE_SECONDS / 4, 1)
+MAX_ATTEMPTS = int(os.environ.get("DVA_JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class LeaseLost(Exception):
+    """The job is no longer running under this worker (lease expired and reclaimed)."""
+
+
+def _connect():
+    os.makedirs(os.path.dirname(JOBS_DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def init_jobs_db():
+    conn = _connect()
+    try:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS report_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            stage TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            result_path TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_report_jobs_status ON report_jobs (status, created_at)")
+    finally:
+        conn.close()
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job.pop("payload", None)
+    return job
+
+
+def enqueue_job(payload: dict):
+    job_id = uuid.uuid4().hex
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO report_jobs (id, status, payload, stage, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), QUEUED, time.time())
+        )
+    finally:
+        conn.close()
+    return job_id
+
+
+def get_job(job_id):
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_job(row)
+
+
+def claim_next_job(worker_id):
+    """Atomically take the oldest runnable job, or return None.
+
+    Runnable means queued, or running with an expired lease. ``BEGIN
+    IMMEDIATE`` takes the write lock up front so two workers can never
+    claim the same row.
+    """
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT * FROM report_jobs
+            WHERE (status = ? OR (status = ? AND heartbeat_at < ?)) AND attempts < ?
+            ORDER BY created_at
+            LIMIT 1
+            """,
+            (QUEUED, RUNNING, now - LEASE_SECONDS, MAX_ATTEMPTS)
+        ).fetchone()
+        if row is None:
+            # Give up on jobs that keep killing their workers.
+            conn.execute(
+                """
+                UPDATE report_jobs SET status = ?, error = ?, finished_at = ?
+                WHERE status = ? AND heartbeat_at < ? AND attempts >= ?
+                """,
+                (FAILED, "Worker lost too many times", now, RUNNING, now - LEASE_SECONDS, MAX_ATTEMPTS)
+            )
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """
+            UPDATE report_jobs
+            SET status = ?, stage = ?, worker_id = ?, attempts = attempts + 1,
+                started_at = ?, heartbeat_at = ?
+            WHERE id = ?
+            """,
+            (RUNNING, "starting", worker_id, now, now, row["id"])
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    job = dict(row, worker_id=worker_id)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def _update_owned(job_id, worker_id, assignments, params):
+    """Update a job only while ``worker_id`` still holds it; False if it doesn't."""
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            f"UPDATE report_jobs SET {assignments} WHERE id = ? AND worker_id = ? AND status = ?",
+            (*params, job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def heartbeat(job_id, worker_id):
+    return _update_owned(job_id, worker_id, "heartbeat_at = ?", (time.time(),))
+
+
+def update_progress(job_id, worker_id, stage, progress):
+    if not _update_owned(job_id, worker_id, "stage = ?, progress = ?, heartbeat_at = ?", (stage, progress, time.time())):
+        raise LeaseLost(job_id)
+
+
+def complete_job(job_id, worker_id, result_path):
+    return _update_owned(
+        job_id, worker_id, "status = ?, stage = ?, progress = 1, result_path = ?, finished_at = ?",
+        (DONE, DONE, result_path, time.time())
+    )
+
+
+def fail_job(job_id, worker_id, error):
+    return _update_owned(
+        job_id, worker_id, "status = ?, stage = ?, error = ?, finished_at = ?",
+        (FAILED, FAILED, error, time.time())
+    )
@@ -1,9 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from webapp.routers import vulnerabilities, report, logo, evidences
+from webapp.routers import vulnerabilities, report, report_jobs, drafts, pdf_report, logo, evidences, templates
 from fastapi.staticfiles import StaticFiles
+from webapp.artifacts import artifact_store
+from webapp.database import async_engine, init_db
+from webapp.warmup import is_warm, start_warmup, warmup_status
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Keep generated_reports/ within its size/TTL budget
+    artifact_store.start_eviction()
+    # ✅ Pre-load the lazily imported report/Excel stacks (DVA_WARMUP)
+    start_warmup()
+    yield
+    artifact_store.stop_eviction()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+# ✅ Create missing tables and the catalog search index
+init_db()
+
+app = FastAPI(lifespan=lifespan)
 
 # ✅ CORS must be applied BEFORE including routers
 app.add_middleware(
@@ -12,13 +32,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "X-Catalog-Revision"],
 )
 
 # ✅ Include routers
 app.include_router(vulnerabilities.router)
 app.include_router(report.router)
+app.include_router(report_jobs.router)
+app.include_router(drafts.router)
+app.include_router(pdf_report.router)
 app.include_router(logo.router)
 app.include_router(evidences.router)
+app.include_router(templates.router)
 
 # ✅ Static path for uploaded images
 app.mount("/uploaded_evidence", StaticFiles(directory="uploaded_evidence"), name="uploaded_evidence")
+
+@app.get("/health")
+def health():
+    # Ready as soon as the app is up; "warm" tells whether the report stack is pre-loaded.
+    return {"status": "ok", "warm": is_warm(), "warmup": warmup_status}
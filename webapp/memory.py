@@ -0,0 +1,180 @@
+"""Bounded-memory report generation.
+
+A normal report keeps python-docx's object tree, every embedded image and
+every evidence rendition in memory until ``doc.save``. In bounded mode:
+
+* evidence renditions are prepared a batch of findings at a time instead
+  of all up front (the size budget is still applied to the whole report);
+* image parts are spooled to a temporary directory as soon as a finding is
+  rendered, so the package only holds their file names and hashes;
+* ``doc.save`` streams the spooled images into the zip one at a time;
+* new renditions and rendered findings are not added to the image and
+  fragment caches (existing entries are still used), since those hold
+  every image blob and would otherwise grow with the report.
+
+Bounded mode is used when the request asks for it, when DVA_BOUNDED_MEMORY
+is true, or (the default, ``auto``) for reports with at least
+DVA_BOUNDED_MEMORY_MIN_FINDINGS findings.
+
+Independently of the mode, DVA_MAX_RSS_MB sets a resident-memory ceiling
+for the rendering process. It is checked between findings; over the limit
+the image/fragment caches are dropped first, and if that isn't enough the
+report fails with MemoryLimitExceeded instead of the container being
+OOM-killed.
+"""
+from contextlib import contextmanager
+import gc
+import hashlib
+import os
+import shutil
+import tempfile
+
+BOUNDED_MEMORY_MODE = os.environ.get("DVA_BOUNDED_MEMORY", "auto").lower()
+BOUNDED_MEMORY_MIN_FINDINGS = int(os.environ.get("DVA_BOUNDED_MEMORY_MIN_FINDINGS", "200"))
+SPOOL_DIR = os.environ.get("DVA_SPOOL_DIR") or None
+# Findings whose evidence renditions are prepared (in parallel) at a time.
+BOUNDED_BATCH_FINDINGS = int(os.environ.get("DVA_BOUNDED_BATCH_FINDINGS", "20"))
+
+MAX_RSS_BYTES = int(float(os.environ.get("DVA_MAX_RSS_MB", "0")) * 1024 * 1024) or None
+
+
+class MemoryLimitExceeded(RuntimeError):
+    pass
+
+
+def use_bounded_memory(requested, findings):
+    if requested is not None:
+        return requested
+    if BOUNDED_MEMORY_MODE in ("1", "true", "yes"):
+        return True
+    if BOUNDED_MEMORY_MODE == "auto":
+        return findings >= BOUNDED_MEMORY_MIN_FINDINGS
+    return False
+
+
+def _proc_status_bytes(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where /proc isn't available."""
+    return _proc_status_bytes("VmRSS")
+
+
+def peak_rss_bytes():
+    peak = _proc_status_bytes("VmHWM")
+    if peak is None:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    return peak
+
+
+def _release_memory():
+    from webapp.fragments import fragment_cache
+    from webapp.images import rendition_cache
+
+    rendition_cache.clear()
+    fragment_cache.clear()
+    gc.collect()
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def check_memory(limit_bytes=None):
+    """Raise MemoryLimitExceeded if RSS is over ``limit_bytes`` (default DVA_MAX_RSS_MB)."""
+    limit_bytes = limit_bytes or MAX_RSS_BYTES
+    if not limit_bytes:
+        return
+    rss = current_rss_bytes()
+    if rss is None or rss <= limit_bytes:
+        return
+    print(f"⚠️ RSS {rss // (1024 * 1024)} MB over the {limit_bytes // (1024 * 1024)} MB limit; dropping caches")
+    _release_memory()
+    rss = current_rss_bytes()
+    if rss > limit_bytes:
+        raise MemoryLimitExceeded(
+            f"Report generation needs more than {limit_bytes // (1024 * 1024)} MB of memory "
+            f"(at {rss // (1024 * 1024)} MB)"
+        )
+
+
+def _spooled_image_part_class():
+    from docx.image.image import Image
+    from docx.parts.image import ImagePart
+
+    class SpooledImagePart(ImagePart):
+        """ImagePart whose bytes live in a spool file instead of memory."""
+
+        @property
+        def blob(self):
+            with open(self._spool_path, "rb") as f:
+                return f.read()
+
+        @property
+        def sha1(self):
+            return self._spool_sha1
+
+        @property
+        def image(self):
+            if self._image is None:
+                self._image = Image.from_blob(self.blob)
+                # Only the header (size, dpi, type) is needed from here on.
+                self._image._blob = None
+            return self._image
+
+    return SpooledImagePart
+
+
+class ImageSpool:
+    """Moves a document's image part bytes into files under ``directory``."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.spooled = 0
+        self._part_class = _spooled_image_part_class()
+        self._done = 0
+
+    def spool(self, doc):
+        """Spool image parts added to ``doc`` since the last call."""
+        # ImageParts only ever appends, so everything before _done is spooled.
+        image_parts = doc.part.package.image_parts._image_parts
+        for part in image_parts[self._done:]:
+            if isinstance(part, self._part_class):
+                continue
+            blob = part.blob
+            path = os.path.join(self.directory, f"{self.spooled:06d}{os.path.splitext(part.partname)[1]}")
+            with open(path, "wb") as f:
+                f.write(blob)
+            part._spool_path = path
+            part._spool_sha1 = hashlib.sha1(blob).hexdigest()
+            if part._image is not None:
+                part._image._blob = None
+            part._blob = None
+            part.__class__ = self._part_class
+            self.spooled += 1
+        self._done = len(image_parts)
+
+
+@contextmanager
+def image_spool(enabled):
+    """Yield an ImageSpool backed by a temporary directory, or None."""
+    if not enabled:
+        yield None
+        return
+    directory = tempfile.mkdtemp(prefix="dva-spool-", dir=SPOOL_DIR)
+    try:
+        yield ImageSpool(directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,16 +1,57 @@
-from sqlalchemy import Column, Integer, String, Text
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, Text, func, select
 from webapp.database import Base
 
 
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    # A single row (id 1), bumped by every write to the vulnerability catalog.
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+def _catalog_revision():
+    # The catalog version of the write in progress; writers bump it first.
+    current = select(CatalogVersion.version).where(CatalogVersion.id == 1).scalar_subquery()
+    return select(func.coalesce(current, 1)).scalar_subquery()
+
+
 class Vulnerability(Base):
     __tablename__ = "vulnerabilities"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, unique=True)
-    severity = Column(String)
-    cvss_score = Column(String)
-    cvss_vector = Column(String)
+    # Explicit lengths so the schema also works on MySQL/PostgreSQL (DVA_DATABASE_URL).
+    title = Column(String(255), unique=True)
+    severity = Column(String(32))
+    cvss_score = Column(String(16))
+    cvss_vector = Column(String(255))
     description = Column(Text)
     evidence = Column(Text)
     recommendation = Column(Text)
     reference = Column(Text)
+    # Catalog version of the last write to this entry, for /vulnerabilities/changes.
+    revision = Column(Integer, nullable=False, default=_catalog_revision(), onupdate=_catalog_revision(),
+                      server_default="1", index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class VulnerabilityTombstone(Base):
+    __tablename__ = "vulnerability_tombstones"
+
+    # Deleted catalog entries, so /vulnerabilities/changes can report deletions.
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=_catalog_revision(), index=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReportDraft(Base):
+    __tablename__ = "report_drafts"
+
+    id = Column(String(32), primary_key=True)
+    # Bumped on every update; sent as the ETag for optimistic concurrency.
+    version = Column(Integer, nullable=False, default=1)
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,123 @@
+"""HTML -> PDF rendering for /report/pdf.
+
+The report HTML is rendered from a ReportModel (webapp.report_model) with a
+Jinja2 template (webapp/templates/report.html) that is compiled once per
+process and autoescapes all payload text.
+Screenshots are embedded as data URIs built from the same optimized
+renditions the DOCX report uses, so the PDF never reads from the source
+tree and nothing is written to disk.
+
+wkhtmltopdf has no resident/server mode, so each PDF still needs one
+process. ``PdfRendererPool`` keeps the resolved wkhtmltopdf configuration
+and caps how many of those processes run at once (DVA_PDF_WORKERS);
+requests beyond that wait up to DVA_PDF_QUEUE_TIMEOUT seconds.
+"""
+from base64 import b64encode
+from functools import lru_cache
+import os
+import threading
+
+from webapp.report_model import build_report_model
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+PDF_WORKERS = int(os.environ.get("DVA_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_QUEUE_TIMEOUT = float(os.environ.get("DVA_PDF_QUEUE_TIMEOUT", "60"))
+
+PDF_OPTIONS = {
+    "encoding": "UTF-8",
+    "quiet": "",
+    "page-size": "A4",
+}
+
+
+class PdfRendererBusy(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _environment():
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_html_template(name="report.html"):
+    return _environment().get_template(name)
+
+
+def _data_uri(rendition):
+    mime = "image/jpeg" if rendition.format == "JPEG" else "image/png"
+    return f"data:{mime};base64,{b64encode(rendition.data).decode('ascii')}"
+
+
+def render_html(model, timer=None):
+    """Render a ReportModel as standalone HTML (screenshots inlined)."""
+    if timer is not None:
+        timer.mark("images")
+    renditions = model.images_for()
+
+    if timer is not None:
+        timer.mark("html")
+    report_findings = []
+    for finding in model.findings:
+        rendered_steps = []
+        for step in finding.steps:
+            images = []
+            for image in step.images:
+                if not image.exists or image.full_path not in renditions:
+                    images.append({"path": image.path, "status": "Image not found"})
+                elif renditions[image.full_path] is None:
+                    images.append({"path": image.path, "status": "Invalid image"})
+                else:
+                    images.append({"path": image.path, "src": _data_uri(renditions[image.full_path])})
+            rendered_steps.append({"comment": step.comment, "images": images})
+        report_findings.append(dict(finding._asdict(), steps=rendered_steps))
+
+    return get_html_template().render(report=dict(model.info._asdict(), findings=report_findings))
+
+
+def model_html(model, timer=None):
+    """The HTML of ``model``, rendered once and shared by the html and pdf outputs."""
+    return model.memo("html", lambda: render_html(model, timer))
+
+
+def build_report_html(payload, timer=None):
+    """Render the report HTML for a PDFReportRequest-like payload."""
+    return render_html(build_report_model(payload), timer)
+
+
+class PdfRendererPool:
+    def __init__(self, workers, queue_timeout):
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        self._configuration = None
+        self._config_lock = threading.Lock()
+
+    def _get_configuration(self):
+        with self._config_lock:
+            if self._configuration is None:
+                import pdfkit
+                self._configuration = pdfkit.configuration()
+            return self._configuration
+
+    def render(self, html):
+        """Convert ``html`` to PDF bytes in memory."""
+        import pdfkit
+
+        configuration = self._get_configuration()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PdfRendererBusy("All PDF renderers are busy, try again later")
+        try:
+            return pdfkit.from_string(html, False, options=PDF_OPTIONS, configuration=configuration)
+        finally:
+            self._slots.release()
+
+
+pdf_renderer = PdfRendererPool(PDF_WORKERS, PDF_QUEUE_TIMEOUT)
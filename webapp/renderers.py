@@ -0,0 +1,86 @@
+"""Render one ReportModel to several output formats concurrently.
+
+The model is parsed and its evidence images are prepared once; the DOCX,
+HTML and PDF back-ends then run side by side on threads (python-docx and
+Jinja hold the GIL only part of the time, Pillow and wkhtmltopdf not at
+all). PDF is rendered from the same HTML as the html output.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import re
+
+from webapp.timing import StageTimer
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# format -> (file extension, media type)
+FORMATS = {
+    "docx": (".docx", DOCX_MEDIA_TYPE),
+    "pdf": (".pdf", "application/pdf"),
+    "html": (".html", "text/html; charset=utf-8"),
+}
+
+
+def _render_docx(model, target, timer):
+    from webapp.docx_report import render_docx
+    render_docx(model, target, timer=timer)
+
+
+def _render_html(model, target, timer):
+    from webapp.pdf_engine import model_html
+    html = model_html(model, timer)
+    timer.mark("write")
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def _render_pdf(model, target, timer):
+    from webapp.pdf_engine import model_html, pdf_renderer
+    html = model_html(model, timer)
+    timer.mark("pdf")
+    pdf = pdf_renderer.render(html)
+    with open(target, "wb") as f:
+        f.write(pdf)
+
+
+RENDERERS = {"docx": _render_docx, "html": _render_html, "pdf": _render_pdf}
+
+
+def parse_formats(value):
+    """``"docx+pdf"`` / ``"docx,pdf"`` -> ``["docx", "pdf"]``; ValueError on unknown formats."""
+    # An unescaped "+" in a query string arrives as a space.
+    formats = list(dict.fromkeys(f.lower() for f in re.split(r"[\s,+]+", value) if f))
+    unknown = [f for f in formats if f not in RENDERERS]
+    if unknown or not formats:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown) or value!r}; use {', '.join(RENDERERS)}")
+    return formats
+
+
+def _run(fmt, model, target):
+    timer = StageTimer(fmt)
+    try:
+        RENDERERS[fmt](model, target, timer)
+        return timer.stop(), None
+    except Exception as e:
+        return timer.stop(), e
+
+
+def render_formats(model, targets, timer=None):
+    """Render ``model`` to every ``{format: path}`` in ``targets``.
+
+    Returns ``{format: exception or None}``; one format failing doesn't stop
+    the others.
+    """
+    timer = timer or StageTimer()
+    timer.mark("images")
+    model.prepare_images()
+
+    timer.mark("render")
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="report-format") as pool:
+        futures = {fmt: pool.submit(_run, fmt, model, path) for fmt, path in targets.items()}
+    errors = {}
+    for fmt, future in futures.items():
+        child, error = future.result()
+        timer.add_child(fmt, child)
+        errors[fmt] = error
+    timer.stop()
+    return errors
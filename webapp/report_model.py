@@ -0,0 +1,167 @@
+"""Normalized, renderer-independent report model.
+
+``build_report_model`` parses a report payload once: both evidence formats
+(DOCX ``steps`` with ``screenshotPath`` and the older ``blocks``) become the
+same list of steps, and every screenshot is resolved to a file on disk.
+Evidence images are prepared once per model (``prepare_images``) and shared
+by every back-end that renders it (see webapp.renderers).
+"""
+from collections import namedtuple
+import os
+import threading
+
+SEVERITY_ORDER = ["Critical", "High", "Medium", "Low"]
+
+# Screenshots are only ever read from here (see webapp.routers.evidences).
+EVIDENCE_DIR = "uploaded_evidence"
+
+ReportInfo = namedtuple("ReportInfo", "app_title scope urls analyst_name requester_name")
+
+# ``path`` is the URL path from the payload, ``clean_path`` the same without
+# the leading slash (used in placeholders), ``full_path`` the file on disk
+# (None if it isn't an existing file under EVIDENCE_DIR).
+EvidenceImage = namedtuple("EvidenceImage", "path clean_path full_path exists")
+EvidenceStep = namedtuple("EvidenceStep", "comment images")
+
+FINDING_FIELDS = ("title", "severity", "cvss_score", "cvss_vector", "description", "recommendation", "reference")
+Finding = namedtuple("Finding", ("index",) + FINDING_FIELDS + ("steps",))
+
+
+def evidence_file(img_path):
+    """Map a /uploaded_evidence/... URL path to (clean_path, full_path).
+
+    ``full_path`` is None unless the path resolves (symlinks included) to a
+    file inside EVIDENCE_DIR; payload paths are never trusted otherwise.
+    """
+    clean_path = (img_path or "").lstrip("/")
+    root = os.path.realpath(EVIDENCE_DIR)
+    full_path = os.path.realpath(os.path.join(".", clean_path))
+    if os.path.commonpath([root, full_path]) != root or not os.path.isfile(full_path):
+        return clean_path, None
+    return clean_path, full_path
+
+
+def screenshot_paths(step):
+    paths = step.get("screenshotPath", [])
+    if isinstance(paths, str):
+        paths = [paths]
+    return paths
+
+
+def normalize_evidence(entry):
+    """Return evidence as ``[{"comment": str, "paths": [str]}]``.
+
+    Accepts the DOCX format (a list of steps with ``comment`` and
+    ``screenshotPath``) and the older ``{"blocks": [...]}`` format with
+    ``text``/``image`` blocks.
+    """
+    if isinstance(entry, dict):
+        steps = []
+        for block in entry.get("blocks", []):
+            if block.get("type") == "text":
+                steps.append({"comment": block.get("content", ""), "paths": []})
+            elif block.get("type") == "image":
+                path = block.get("src") or block.get("path") or block.get("content")
+                if steps and not steps[-1]["paths"]:
+                    steps[-1]["paths"].append(path)
+                else:
+                    steps.append({"comment": "", "paths": [path]})
+        return steps
+
+    return [
+        {"comment": step.get("comment", ""), "paths": [p for p in screenshot_paths(step) if p]}
+        for step in entry or []
+    ]
+
+
+def _field(vuln, name, default=""):
+    value = vuln.get(name) if isinstance(vuln, dict) else getattr(vuln, name, None)
+    return default if value is None else value
+
+
+def _evidence_image(path):
+    clean_path, full_path = evidence_file(path)
+    return EvidenceImage(path, clean_path, full_path, full_path is not None)
+
+
+class ReportModel:
+    def __init__(self, info, findings, template=None, max_report_bytes=None, bounded=False):
+        self.info = info
+        self.findings = findings
+        self.template = template
+        self.max_report_bytes = max_report_bytes
+        # Bounded-memory mode (webapp.memory): renditions are produced per
+        # batch of findings instead of being held for the whole report, and
+        # aren't added to the rendition cache.
+        self.bounded = bounded
+        self._renditions = None
+        self._level = None
+        self._lock = threading.Lock()
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def severity_counts(self):
+        return tuple(sum(1 for f in self.findings if f.severity == sev) for sev in SEVERITY_ORDER)
+
+    def evidence_paths(self, findings=None):
+        """Existing screenshot files of ``findings`` (default: all), in order."""
+        return [
+            image.full_path
+            for finding in (self.findings if findings is None else findings)
+            for step in finding.steps
+            for image in step.images
+            if image.exists
+        ]
+
+    def prepare_images(self):
+        """Optimize the evidence images (once, whichever renderer asks first)."""
+        from webapp.images import choose_quality_level, prepare_evidence_images
+
+        with self._lock:
+            if self.bounded:
+                if self._level is None:
+                    self._level = choose_quality_level(
+                        self.evidence_paths(), self.max_report_bytes, cache=False
+                    )
+            elif self._renditions is None:
+                self._renditions = prepare_evidence_images(
+                    self.evidence_paths(), max_report_bytes=self.max_report_bytes
+                )
+
+    def memo(self, key, build):
+        """Return ``build()``, computed once per model (e.g. the HTML shared by html and pdf)."""
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = build()
+            return self._memo[key]
+
+    def images_for(self, findings=None):
+        """``{full_path: Rendition or None}`` covering ``findings`` (default: all)."""
+        from webapp.images import prepare_evidence_images
+
+        self.prepare_images()
+        if not self.bounded:
+            return self._renditions
+        return prepare_evidence_images(self.evidence_paths(findings), level=self._level, cache=False)
+
+
+def build_report_model(payload, max_report_bytes=None, bounded=False):
+    """Build a ReportModel from a ReportRequest or PDFReportRequest-like payload."""
+    findings = []
+    for idx, vuln in enumerate(payload.vulnerabilities, 1):
+        key = str(_field(vuln, "instanceId", None) or _field(vuln, "id"))
+        steps = [
+            EvidenceStep(step["comment"], [_evidence_image(p) for p in step["paths"]])
+            for step in normalize_evidence(payload.evidence_data.get(key, []))
+        ]
+        findings.append(Finding(idx, *(str(_field(vuln, name)) for name in FINDING_FIELDS), steps))
+
+    info = ReportInfo(
+        payload.app_title, payload.scope, payload.urls, payload.analyst_name, payload.requester_name
+    )
+    return ReportModel(
+        info, findings,
+        template=getattr(payload, "template", None),
+        max_report_bytes=max_report_bytes,
+        bounded=bounded
+    )
@@ -0,0 +1,232 @@
+"""Compiled DOCX report skeletons.
+
+A skeleton is everything that comes before the findings: cover page, logo
+header/footer, "Version Information" table and document styles. Skeletons
+are compiled once into normalized .docx bytes and cloned per report; only
+the ``{{placeholder}}`` text is filled in on the hot path.
+
+Clients can upload their own branded .docx (see webapp.routers.templates);
+otherwise the built-in skeleton using uploaded_logos/logo.png is used.
+
+Supported placeholders: app_title, requester_name, analyst_name, scope,
+urls and date.
+"""
+from io import BytesIO
+import hashlib
+import os
+import re
+import threading
+
+# python-docx is imported inside the functions that need it so that the
+# templates router can be loaded without pulling in the rendering stack.
+
+TEMPLATE_DIR = "uploaded_templates"
+LOGO_PATH = "uploaded_logos/logo.png"
+
+CLIENT_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+PLACEHOLDERS = ("app_title", "requester_name", "analyst_name", "scope", "urls", "date")
+
+# Styles the report body is rendered with; a template must define them.
+REQUIRED_STYLES = ("Heading 2", "Heading 3", "Heading 4", "Table Grid")
+
+# Parts that can carry placeholders: the body, headers and footers.
+_TEXT_PART_RE = re.compile(r"^/word/(document|header\d*|footer\d*)\.xml$")
+
+
+class TemplateNotFound(ValueError):
+    pass
+
+
+class CompiledTemplate:
+    def __init__(self, blob, placeholders):
+        self.blob = blob
+        self.placeholders = placeholders
+        # Identifies the skeleton (and hence its style ids) in fragment cache keys.
+        self.key = hashlib.sha1(blob).hexdigest()
+
+    def render(self, context):
+        """Return a new Document cloned from the template with placeholders filled."""
+        from docx import Document
+        from docx.oxml.ns import qn
+
+        doc = Document(BytesIO(self.blob))
+        if self.placeholders:
+            for element in _text_part_elements(doc):
+                for t in element.iter(qn("w:t")):
+                    if t.text and "{{" in t.text:
+                        t.text = PLACEHOLDER_RE.sub(
+                            lambda m: str(context.get(m.group(1), m.group(0))), t.text
+                        )
+        return doc
+
+
+def _text_part_elements(doc):
+    for part in doc.part.package.iter_parts():
+        if _TEXT_PART_RE.match(str(part.partname)):
+            yield part.element
+
+
+def _normalize_placeholders(doc):
+    """Make every placeholder live inside a single w:t.
+
+    Word often splits ``{{app_title}}`` across several runs (spell check,
+    edits, formatting). For such paragraphs the text is moved into the first
+    run so substitution at render time is a plain string replace.
+    """
+    from docx.oxml.ns import qn
+
+    found = set()
+    for element in _text_part_elements(doc):
+        for p in element.iter(qn("w:p")):
+            texts = list(p.iter(qn("w:t")))
+            full = "".join(t.text or "" for t in texts)
+            names = PLACEHOLDER_RE.findall(full)
+            if not names:
+                continue
+            found.update(names)
+            if sum(len(PLACEHOLDER_RE.findall(t.text or "")) for t in texts) == len(names):
+                continue
+            texts[0].text = full
+            texts[0].set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+            for t in texts[1:]:
+                t.text = ""
+    return found
+
+
+def compile_template(source):
+    """Compile a .docx (path, stream or Document) into a CompiledTemplate."""
+    from docx import Document
+
+    doc = source if hasattr(source, "part") else Document(source)
+    style_names = {style.name for style in doc.styles}
+    missing = [name for name in REQUIRED_STYLES if name not in style_names]
+    if missing:
+        raise ValueError(f"Template is missing required styles: {', '.join(missing)}")
+    placeholders = _normalize_placeholders(doc)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return CompiledTemplate(buffer.getvalue(), placeholders)
+
+
+def _build_default_skeleton(logo_path):
+    from docx import Document
+    from docx.shared import Pt, RGBColor, Inches
+
+    doc = Document()
+    doc.styles['Normal'].font.name = 'Calibri'
+    doc.styles['Normal'].font.size = Pt(11)
+
+    if logo_path:
+        para = doc.add_paragraph()
+        para.alignment = 1
+        para.add_run().add_picture(logo_path, width=Inches(2.5))
+
+    title = doc.add_paragraph("\n\nDynamic Vulnerability Assessment")
+    title.alignment = 1
+    run = title.runs[0]
+    run.bold = True
+    run.font.size = Pt(28)
+    run.font.color.rgb = RGBColor(0, 102, 204)
+
+    app = doc.add_paragraph("{{app_title}}")
+    app.alignment = 1
+    run = app.runs[0]
+    run.bold = True
+    run.font.size = Pt(26)
+    run.font.color.rgb = RGBColor(0, 102, 204)
+
+    requester = doc.add_paragraph()
+    requester.alignment = 0
+    req_run = requester.add_run("Requested by: ")
+    req_run.bold = True
+    requester.add_run("{{requester_name}}")
+
+    doc.add_page_break()
+
+    section = doc.sections[0]
+    if logo_path:
+        header = section.header
+        header_para = header.paragraphs[0]
+        header_para.alignment = 2
+        header_para.add_run().add_picture(logo_path, width=Inches(1.0))
+
+    footer = section.footer.paragraphs[0]
+    footer.text = "Confidential - For Internal Use Only"
+    footer.alignment = 1
+
+    doc.add_heading("Version Information", level=2).runs[0].font.size = Pt(18)
+    table = doc.add_table(rows=4, cols=3)
+    table.style = 'Table Grid'
+    headers = ["Date", "Application Version", "Reviewer"]
+    for i, h in enumerate(headers):
+        table.cell(0, i).text = h
+    table.cell(1, 0).text = "{{date}}"
+    table.cell(1, 1).text = "Initial Draft"
+    table.cell(1, 2).text = "{{analyst_name}}"
+    table.cell(2, 0).text = "{{date}}"
+    table.cell(2, 1).text = "Peer Review"
+    table.cell(3, 0).text = "{{date}}"
+    table.cell(3, 1).text = "Approved"
+
+    doc.add_page_break()
+    return doc
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(key, signature, build):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+    compiled = build()
+    with _cache_lock:
+        _cache[key] = (signature, compiled)
+    return compiled
+
+
+def template_path(client):
+    if not CLIENT_NAME_RE.match(client or ""):
+        raise ValueError(f"Invalid template name: {client!r}")
+    return os.path.join(TEMPLATE_DIR, f"{client}.docx")
+
+
+def get_template(client=None):
+    """Return the compiled skeleton for ``client`` (or the built-in one).
+
+    Compiled skeletons are cached and rebuilt only when the uploaded
+    template or logo file changes. Raises TemplateNotFound for an unknown
+    or invalid ``client``.
+    """
+    if client:
+        try:
+            path = template_path(client)
+        except ValueError as e:
+            raise TemplateNotFound(str(e)) from e
+        signature = _file_signature(path)
+        if signature is None:
+            raise TemplateNotFound(f"Template not found: {client}")
+        return _cached(("client", client), signature, lambda: compile_template(path))
+
+    signature = _file_signature(LOGO_PATH)
+    logo_path = LOGO_PATH if signature else None
+    return _cached(
+        ("default",), signature,
+        lambda: compile_template(_build_default_skeleton(logo_path))
+    )
+
+
+def invalidate_template(client=None):
+    with _cache_lock:
+        _cache.pop(("client", client) if client else ("default",), None)
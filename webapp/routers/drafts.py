@@ -0,0 +1,153 @@
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+import json
+import os
+
+from webapp import crud, jobs
+from webapp.cache import SizedLRUCache
+from webapp.drafts import PatchError, PatchTestFailed, apply_patch
+from webapp.routers.report import STREAM_REPORTS_DEFAULT, ReportRequest, check_template, generate_report
+from webapp.routers.vulnerabilities import get_db
+
+router = APIRouter(prefix="/report/drafts", tags=["Report Drafts"])
+
+# Validated ReportRequests by (draft id, version), so generating the same
+# draft version again skips parsing and validation.
+_validated = SizedLRUCache(64, sizeof=lambda _: 1)
+
+# PATCH without If-Match retries this often when a concurrent save wins.
+PATCH_RETRIES = 3
+
+# Drafts nobody has saved for this long are deleted (0 keeps them forever).
+DRAFT_TTL_DAYS = float(os.environ.get("DVA_DRAFT_TTL_DAYS", "30"))
+
+
+def _etag(draft):
+    return f'"{draft.version}"'
+
+
+def _parse_etag(value):
+    try:
+        return int(value.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {value}")
+
+
+def _get_draft_or_404(db, draft_id):
+    draft = crud.get_draft(db, draft_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return draft
+
+
+def _summary(draft):
+    return {"id": draft.id, "version": draft.version, "updated_at": draft.updated_at}
+
+
+def _report_request(draft):
+    key = (draft.id, draft.version)
+    payload = _validated.get(key)
+    if payload is None:
+        try:
+            payload = ReportRequest(**json.loads(draft.data))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+        _validated.put(key, payload)
+    return payload
+
+
+def _draft_payload(db, draft_id):
+    """The draft's ReportRequest, with its template checked before any work starts."""
+    payload = _report_request(_get_draft_or_404(db, draft_id))
+    check_template(payload)
+    return payload
+
+
+@router.post("/", status_code=201)
+def create_draft(response: Response, data: dict = Body(default={}), db: Session = Depends(get_db)):
+    if DRAFT_TTL_DAYS:
+        # Abandoned drafts are cleared out whenever a new one starts.
+        expired = crud.delete_expired_drafts(db, datetime.utcnow() - timedelta(days=DRAFT_TTL_DAYS))
+        if expired:
+            print(f"🧹 Deleted {expired} drafts not saved for {DRAFT_TTL_DAYS:g} days")
+    draft = crud.create_draft(db, data)
+    response.headers["ETag"] = _etag(draft)
+    response.headers["Location"] = f"/report/drafts/{draft.id}"
+    return _summary(draft)
+
+
+@router.get("/{draft_id}")
+def get_draft(
+    draft_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    draft = _get_draft_or_404(db, draft_id)
+    if if_none_match == _etag(draft):
+        return Response(status_code=304, headers={"ETag": _etag(draft)})
+    response.headers["ETag"] = _etag(draft)
+    return dict(_summary(draft), data=json.loads(draft.data))
+
+
+@router.patch("/{draft_id}")
+def patch_draft(
+    draft_id: str,
+    response: Response,
+    operations: list = Body(...),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    # Body is a JSON Patch (application/json-patch+json), see webapp.drafts.
+    expected = _parse_etag(if_match) if if_match else None
+    for _ in range(PATCH_RETRIES):
+        draft = _get_draft_or_404(db, draft_id)
+        if expected is not None and draft.version != expected:
+            raise HTTPException(status_code=412, detail=f"Draft has changed (now version {draft.version})")
+        try:
+            data = apply_patch(json.loads(draft.data), operations)
+        except PatchTestFailed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except PatchError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=422, detail="A draft must stay a JSON object")
+
+        if crud.update_draft(db, draft_id, data, draft.version):
+            db.expire_all()
+            draft = _get_draft_or_404(db, draft_id)
+            response.headers["ETag"] = _etag(draft)
+            return _summary(draft)
+        if expected is not None:
+            break
+        db.expire_all()
+    raise HTTPException(status_code=412, detail="Draft was changed concurrently, reload and retry")
+
+
+@router.delete("/{draft_id}")
+def delete_draft(draft_id: str, db: Session = Depends(get_db)):
+    if not crud.delete_draft(db, draft_id):
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return {"message": "Deleted successfully"}
+
+
+@router.post("/{draft_id}/report")
+def generate_draft_report(
+    draft_id: str,
+    stream: bool = Query(STREAM_REPORTS_DEFAULT),
+    profile: bool = Query(False),
+    x_dva_profile: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    payload = _draft_payload(db, draft_id)
+    return generate_report(payload, stream=stream, profile=profile, x_dva_profile=x_dva_profile)
+
+
+@router.post("/{draft_id}/jobs", status_code=202)
+def submit_draft_report_job(draft_id: str, db: Session = Depends(get_db)):
+    payload = _draft_payload(db, draft_id)
+    job_id = jobs.enqueue_job(payload.model_dump())
+    return {"job_id": job_id, "status": jobs.QUEUED}
@@ -1,20 +1,30 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from datetime import datetime
+from typing import Optional
 import os
+import tempfile
 import uuid
-from collections import Counter
-from PIL import Image as PILImage
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
+from webapp.artifacts import artifact_store
+from webapp.bundle import iter_report_bundle
+from webapp.docx_report import render_docx
+from webapp.memory import MemoryLimitExceeded, use_bounded_memory
+from webapp.renderers import DOCX_MEDIA_TYPE, FORMATS, parse_formats, render_formats
+from webapp.report_model import build_report_model
+from webapp.report_templates import TemplateNotFound, get_template
+from webapp.timing import StageTimer, maybe_profile, profile_requested, timing_headers
 
 router = APIRouter(prefix="/report", tags=["Report"])
 
+# When true, reports are built in memory and streamed back without ever
+# touching generated_reports/. Can be overridden per request with ?stream=.
+STREAM_REPORTS_DEFAULT = os.environ.get("DVA_STREAM_REPORTS", "false").lower() in ("1", "true", "yes")
+
+DEFAULT_MAX_REPORT_MB = float(os.environ.get("DVA_MAX_REPORT_MB", "0")) or None
+
+# Streamed reports larger than this are buffered in a temp file, not in memory.
+STREAM_SPOOL_BYTES = 32 * 1024 * 1024
+
 class Vulnerability(BaseModel):
     id: int
     title: str
@@ -34,221 +44,151 @@ class ReportRequest(BaseModel):
     requester_name: str
     vulnerabilities: list[Vulnerability]
     evidence_data: dict
-
-def generate_pie_chart(vulns, chart_path):
-    severity_order = ["Critical", "High", "Medium", "Low"]
-    color_map = {
-        "Critical": "maroon",
-        "High": "red",
-        "Medium": "orange",
-        "Low": "green"
-    }
-
-    severity_counts = Counter(v.severity for v in vulns)
-    labels = [sev for sev in severity_order if severity_counts[sev] > 0]
-    sizes = [severity_counts[sev] for sev in labels]
-    colors = [color_map[sev] for sev in labels]
-
-    def make_autopct(values):
-        def _autopct(pct):
-            total = sum(values)
-            val = int(round(pct * total / 100.0))
-            return f"{val}" if val > 0 else ""
-        return _autopct
-
-    plt.figure(figsize=(4, 4))
-    wedges, texts, autotexts = plt.pie(
-        sizes,
-        labels=labels,
-        colors=colors,
-        autopct=make_autopct(sizes),
-        startangle=140
+    # Optional size budget; evidence image quality is lowered to fit it.
+    max_report_mb: Optional[float] = None
+    # Name of an uploaded branded template (see /templates/); built-in if unset.
+    template: Optional[str] = None
+    # Spool images to disk while rendering (see webapp.memory); auto if unset.
+    bounded_memory: Optional[bool] = None
+
+def report_model(payload: ReportRequest):
+    """Parse ``payload`` into the ReportModel every output format renders from."""
+    max_report_mb = payload.max_report_mb or DEFAULT_MAX_REPORT_MB
+    return build_report_model(
+        payload,
+        max_report_bytes=int(max_report_mb * 1024 * 1024) if max_report_mb else None,
+        bounded=use_bounded_memory(payload.bounded_memory, len(payload.vulnerabilities))
     )
-    for autotext in autotexts:
-        autotext.set_color('white')
-        autotext.set_fontsize(10)
-        autotext.set_weight("bold")
-
-    legend_labels = [f"{severity_counts[sev]} {sev}" for sev in labels]
-    patches = [Patch(color=color_map[sev], label=legend_labels[i]) for i, sev in enumerate(labels)]
-    plt.legend(handles=patches, loc="best")
-    plt.axis('equal')
-    plt.tight_layout()
-    plt.savefig(chart_path)
-    plt.close()
+
+def check_template(payload: ReportRequest, formats=("docx",)):
+    """Reject an unusable ``payload.template`` before anything is rendered or streamed."""
+    if not payload.template:
+        return
+    # Branded templates are .docx skeletons; the HTML/PDF layout has no equivalent.
+    other = [fmt for fmt in formats if fmt != "docx"]
+    if other:
+        raise HTTPException(
+            status_code=400, detail=f"Templates only apply to docx output, not {', '.join(other)}"
+        )
+    try:
+        get_template(payload.template)
+    except TemplateNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def render_report(payload: ReportRequest, target, progress=None, timer=None):
+    """Render the DOCX report into ``target``, a file path or writable binary stream."""
+    return render_docx(report_model(payload), target, progress, timer)
+
+def _iter_file(f, chunk_size=1024 * 1024):
+    try:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+def _log_timing(timer, payload, size):
+    timer.log(findings=len(payload.vulnerabilities), template=payload.template, output_bytes=size)
 
 @router.post("/", response_class=FileResponse)
-def generate_report(payload: ReportRequest):
-    doc = Document()
-    doc.styles['Normal'].font.name = 'Calibri'
-    doc.styles['Normal'].font.size = Pt(11)
-
-    severity_order = ["Critical", "High", "Medium", "Low"]
-    severity_colors = {
-        "Critical": RGBColor(128, 0, 0),
-        "High": RGBColor(255, 0, 0),
-        "Medium": RGBColor(255, 191, 0),
-        "Low": RGBColor(0, 128, 0)
-    }
-
-    # List to track temp files to delete
-    temp_files_to_delete = []
-
-    logo_path = "uploaded_logos/logo.png"
-    if os.path.exists(logo_path):
-        para = doc.add_paragraph()
-        para.alignment = 1
-        para.add_run().add_picture(logo_path, width=Inches(2.5))
-
-    title = doc.add_paragraph("\n\nDynamic Vulnerability Assessment")
-    title.alignment = 1
-    run = title.runs[0]
-    run.bold = True
-    run.font.size = Pt(28)
-    run.font.color.rgb = RGBColor(0, 102, 204)
-
-    app = doc.add_paragraph(payload.app_title)
-    app.alignment = 1
-    run = app.runs[0]
-    run.bold = True
-    run.font.size = Pt(26)
-    run.font.color.rgb = RGBColor(0, 102, 204)
-
-    requester = doc.add_paragraph()
-    requester.alignment = 0
-    req_run = requester.add_run("Requested by: ")
-    req_run.bold = True
-    requester.add_run(payload.requester_name)
-
-    doc.add_page_break()
-
-    section = doc.sections[0]
-    if os.path.exists(logo_path):
-        header = section.header
-        header_para = header.paragraphs[0]
-        header_para.alignment = 2
-        header_para.add_run().add_picture(logo_path, width=Inches(1.0))
-
-    footer = section.footer.paragraphs[0]
-    footer.text = "Confidential - For Internal Use Only"
-    footer.alignment = 1
-
-    doc.add_heading("Version Information", level=2).runs[0].font.size = Pt(18)
-    table = doc.add_table(rows=4, cols=3)
-    table.style = 'Table Grid'
-    headers = ["Date", "Application Version", "Reviewer"]
-    for i, h in enumerate(headers):
-        table.cell(0, i).text = h
-    today = datetime.now().strftime("%d-%b-%Y")
-    table.cell(1, 0).text = today
-    table.cell(1, 1).text = "Initial Draft"
-    table.cell(1, 2).text = payload.analyst_name
-    table.cell(2, 0).text = today
-    table.cell(2, 1).text = "Peer Review"
-    table.cell(3, 0).text = today
-    table.cell(3, 1).text = "Approved"
-
-    doc.add_page_break()
-
-    os.makedirs("generated_reports", exist_ok=True)
-    pie_path = os.path.join("generated_reports", f"pie_{uuid.uuid4().hex}.png")
-    generate_pie_chart(payload.vulnerabilities, pie_path)
-    doc.add_paragraph().add_run("Vulnerability Severity Distribution").bold = True
-    doc.add_picture(pie_path, width=Inches(4.5))
-    doc.paragraphs[-1].alignment = 1
-    doc.add_page_break()
-
-    doc.add_heading("Summary Table", level=2).runs[0].font.size = Pt(18)
-    summary_table = doc.add_table(rows=1, cols=4)
-    summary_table.style = 'Table Grid'
-    hdrs = ["Sl. No.", "Security Observation", "Risk Rating", "Page No."]
-    for i, h in enumerate(hdrs):
-        summary_table.cell(0, i).text = h
-
-    count = 1
-    page_counter = 4
-    for sev in severity_order:
-        group = [v for v in payload.vulnerabilities if v.severity == sev]
-        if group:
-            row = summary_table.add_row().cells
-            row[0].merge(row[3])
-            heading = row[0].paragraphs[0].add_run(f"{sev} Severity")
-            heading.bold = True
-            heading.font.color.rgb = severity_colors[sev]
-            for v in group:
-                row = summary_table.add_row().cells
-                row[0].text = str(count)
-                row[1].text = v.title
-                risk = row[2].paragraphs[0].add_run(v.severity)
-                risk.font.color.rgb = severity_colors[v.severity]
-                row[3].text = str(page_counter)
-                count += 1
-                page_counter += 1
-
-    doc.add_page_break()
-    doc.add_heading("URLs and Scope", level=2).runs[0].font.size = Pt(18)
-    doc.add_paragraph(f"URLs: {payload.urls}")
-    doc.add_paragraph(f"Scope: {payload.scope}")
-    doc.add_page_break()
-
-    doc.add_heading("Vulnerability Details", level=2).runs[0].font.size = Pt(18)
-
-    for idx, vuln in enumerate(payload.vulnerabilities, 1):
-        doc.add_page_break()
-        doc.add_heading(f"{idx}. {vuln.title}", level=3).runs[0].font.size = Pt(18)
-
-        para = doc.add_paragraph()
-        para.add_run("Severity: ").bold = True
-        sev_run = para.add_run(vuln.severity)
-        sev_run.bold = True
-        sev_run.font.color.rgb = severity_colors.get(vuln.severity, RGBColor(0, 0, 0))
-
-        doc.add_paragraph(f"CVSS Score: {vuln.cvss_score}")
-        doc.add_paragraph(f"CVSS Vector: {vuln.cvss_vector}")
-
-        doc.add_heading("Description", level=4).runs[0].font.size = Pt(18)
-        doc.add_paragraph(vuln.description)
-
-        doc.add_heading("Evidence", level=4).runs[0].font.size = Pt(18)
-        steps = payload.evidence_data.get(str(vuln.instanceId or vuln.id), [])
-        for step_idx, step in enumerate(steps, 1):
-            doc.add_paragraph(f"Step {step_idx}: {step.get('comment', '')}")
-
-            paths = step.get("screenshotPath", [])
-            if isinstance(paths, str):
-                paths = [paths]
-
-            for img_path in paths:
-                clean_path = img_path.lstrip("/")
-                full_path = os.path.join(".", clean_path)
-                if os.path.exists(full_path):
-                    try:
-                        with PILImage.open(full_path) as img:
-                            img.verify()
-                        doc.add_picture(full_path, width=Inches(4))
-                    except Exception as e:
-                        doc.add_paragraph(f"[Invalid image: {clean_path}]")
-                else:
-                    doc.add_paragraph(f"[Image not found: {clean_path}]")
-
-        doc.add_heading("Recommendation", level=4).runs[0].font.size = Pt(18)
-        doc.add_paragraph(vuln.recommendation)
-        doc.add_heading("Reference", level=4).runs[0].font.size = Pt(18)
-        doc.add_paragraph(vuln.reference)
-
-    filename = f"report_{uuid.uuid4().hex}.docx"
-    filepath = os.path.join("generated_reports", filename)
-    doc.save(filepath)
-
-    # ✅ Cleanup temp files
-    for f in temp_files_to_delete:
+def generate_report(
+    payload: ReportRequest,
+    stream: bool = Query(STREAM_REPORTS_DEFAULT),
+    profile: bool = Query(False),
+    x_dva_profile: Optional[str] = Header(None)
+):
+    # ?profile=1 or X-DVA-Profile: 1 dumps a cProfile of this request (see webapp.timing).
+    check_template(payload)
+    timer = StageTimer()
+    if stream:
+        buffer = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_BYTES)
         try:
-            os.remove(f)
-        except Exception as e:
-            print(f"⚠️ Could not delete temp file {f}: {e}")
+            with maybe_profile(profile_requested(profile, x_dva_profile), "report") as prof:
+                render_report(payload, buffer, timer=timer)
+        except MemoryLimitExceeded as e:
+            buffer.close()
+            raise HTTPException(status_code=413, detail=str(e))
+        _log_timing(timer, payload, buffer.tell())
+        buffer.seek(0)
+        return StreamingResponse(
+            _iter_file(buffer),
+            media_type=DOCX_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": 'attachment; filename="DVA_Report.docx"',
+                **timing_headers(timer, prof)
+            }
+        )
+
+    name, filepath = artifact_store.new_path("report", ".docx")
+    try:
+        with maybe_profile(profile_requested(profile, x_dva_profile), "report") as prof:
+            render_report(payload, filepath, timer=timer)
+    except MemoryLimitExceeded as e:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise HTTPException(status_code=413, detail=str(e))
+    _log_timing(timer, payload, os.path.getsize(filepath))
 
     return FileResponse(
         filepath,
         filename="DVA_Report.docx",
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Location": f"/report/artifacts/{name}", **timing_headers(timer, prof)}
+    )
+
+@router.post("/render")
+def render_report_formats(payload: ReportRequest, formats: str = Query("docx,pdf,html")):
+    # One parse and one image pass, then every requested format is rendered
+    # concurrently and stored as an artifact.
+    try:
+        wanted = parse_formats(formats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    check_template(payload, wanted)
+
+    timer = StageTimer()
+    timer.mark("parse")
+    model = report_model(payload)
+    key = uuid.uuid4().hex
+    names, targets = {}, {}
+    for fmt in wanted:
+        names[fmt], targets[fmt] = artifact_store.new_path("report", FORMATS[fmt][0], key=key)
+    errors = render_formats(model, targets, timer)
+
+    results = {}
+    for fmt in wanted:
+        if errors[fmt] is not None:
+            print(f"❌ Rendering {fmt} failed: {errors[fmt]}")
+            if os.path.exists(targets[fmt]):
+                os.remove(targets[fmt])
+            results[fmt] = {"error": str(errors[fmt])}
+        else:
+            results[fmt] = {"url": f"/report/artifacts/{names[fmt]}", "bytes": os.path.getsize(targets[fmt])}
+    timer.log(findings=len(payload.vulnerabilities), formats=wanted)
+
+    if all("error" in r for r in results.values()):
+        raise HTTPException(status_code=500, detail=results)
+    return JSONResponse(results, headers=timing_headers(timer))
+
+@router.post("/bundle")
+def generate_report_bundle(payload: ReportRequest):
+    # ZIP with findings.json/csv, original screenshots and the DOCX, built on the fly.
+    # Errors can't be reported once the ZIP has started, so check first.
+    check_template(payload)
+    return StreamingResponse(
+        iter_report_bundle(payload),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="DVA_Report_Bundle.zip"'}
     )
+
+@router.get("/artifacts/{name}", response_class=FileResponse)
+def download_artifact(name: str):
+    # FileResponse honours Range requests, so large reports can be resumed.
+    path = artifact_store.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired")
+    ext = os.path.splitext(name)[1]
+    media_type = next((media for e, media in FORMATS.values() if e == ext), None)
+    return FileResponse(path, filename=name, media_type=media_type)
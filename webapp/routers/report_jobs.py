@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
+import json
+import os
+
+from webapp import jobs
+from webapp.routers.report import DOCX_MEDIA_TYPE, ReportRequest, check_template
+
+router = APIRouter(prefix="/report/jobs", tags=["Report Jobs"])
+
+jobs.init_jobs_db()
+
+SSE_POLL_SECONDS = 0.5
+
+
+def _get_job_or_404(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/", status_code=202)
+def submit_report_job(payload: ReportRequest):
+    check_template(payload)
+    job_id = jobs.enqueue_job(payload.model_dump())
+    return {"job_id": job_id, "status": jobs.QUEUED}
+
+
+@router.get("/{job_id}")
+def get_report_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    job.pop("result_path", None)
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_report_job(job_id: str):
+    _get_job_or_404(job_id)
+
+    async def events():
+        last = None
+        while True:
+            job = await asyncio.to_thread(jobs.get_job, job_id)
+            if job is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found\"}\n\n"
+                return
+            state = (job["status"], job["stage"], job["progress"])
+            if state != last:
+                last = state
+                data = {k: job[k] for k in ("id", "status", "stage", "progress", "error")}
+                yield f"event: progress\ndata: {json.dumps(data)}\n\n"
+            if job["status"] in jobs.FINISHED_STATES:
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{job_id}/download", response_class=FileResponse)
+def download_report_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    if job["status"] == jobs.FAILED:
+        raise HTTPException(status_code=409, detail=f"Report generation failed: {job['error']}")
+    if job["status"] != jobs.DONE:
+        raise HTTPException(status_code=409, detail=f"Report is not ready yet ({job['status']})")
+    if not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail="Report file is no longer available")
+
+    return FileResponse(
+        job["result_path"],
+        filename="DVA_Report.docx",
+        media_type=DOCX_MEDIA_TYPE
+    )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from io import BytesIO
+import os
+
+from webapp import report_templates
+
+router = APIRouter(prefix="/templates", tags=["Templates"])
+
+os.makedirs(report_templates.TEMPLATE_DIR, exist_ok=True)
+
+
+@router.get("/")
+def list_templates():
+    names = sorted(
+        f[:-len(".docx")] for f in os.listdir(report_templates.TEMPLATE_DIR) if f.endswith(".docx")
+    )
+    return {"templates": names, "placeholders": list(report_templates.PLACEHOLDERS)}
+
+
+@router.post("/{client}")
+async def upload_template(client: str, file: UploadFile = File(...)):
+    try:
+        path = report_templates.template_path(client)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    contents = await file.read()
+    try:
+        compiled = report_templates.compile_template(BytesIO(contents))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .docx template: {e}")
+
+    with open(path, "wb") as buffer:
+        buffer.write(contents)
+    report_templates.invalidate_template(client)
+
+    unknown = sorted(compiled.placeholders - set(report_templates.PLACEHOLDERS))
+    return {
+        "message": "Template uploaded successfully",
+        "template": client,
+        "placeholders": sorted(compiled.placeholders),
+        "unknown_placeholders": unknown
+    }
+
+
+@router.delete("/{client}")
+def delete_template(client: str):
+    try:
+        path = report_templates.template_path(client)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Template not found")
+    os.remove(path)
+    report_templates.invalidate_template(client)
+    return {"message": "Deleted successfully"}
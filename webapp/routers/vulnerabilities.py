@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
 from sqlalchemy.orm import Session
-from webapp import crud, schemas, models
-from webapp.database import SessionLocal
-from fastapi.responses import FileResponse
-from io import BytesIO
-import pandas as pd
+from typing import Optional
+from webapp import catalog_batch, catalog_export, catalog_import, crud, schemas, models, search
+from webapp.cache import SizedLRUCache
+from webapp.database import AsyncSessionLocal, SessionLocal
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import base64
+import hashlib
+import json
 import os
 
 router = APIRouter(prefix="/vulnerabilities", tags=["vulnerabilities"])
 
+# Serialized catalog responses by (catalog version, query). A write bumps the
+# version, so stale entries are never served; they are dropped right away.
+CATALOG_CACHE_BYTES = int(float(os.environ.get("DVA_CATALOG_CACHE_MB", "32")) * 1024 * 1024)
+catalog_cache = SizedLRUCache(CATALOG_CACHE_BYTES, sizeof=lambda entry: len(entry[0]))
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -17,20 +27,276 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/", response_model=list[schemas.Vulnerability])
-def read_vulnerabilities(db: Session = Depends(get_db)):
-    return crud.get_vulnerabilities(db)
+# With DVA_ASYNC_DB=true, catalog reads (list, search, item) go through an
+# async session (see webapp.database); writes stay on the threadpool.
+ASYNC_READS = AsyncSessionLocal is not None
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _read_route(path, sync_endpoint, async_endpoint, **kwargs):
+    router.get(path, **kwargs)(async_endpoint if ASYNC_READS else sync_endpoint)
+
+def _catalog_changed():
+    catalog_cache.clear()
+
+def _etag_matches(header, etag):
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def _not_modified(request, etag, modified):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _conditional(request, version, modified, key):
+    """Validators for a catalog response; returns (headers, 304 response or None)."""
+    etag = f'"{version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:12]}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+        # Where a client that just loaded the catalog continues with /changes?since=.
+        "X-Catalog-Revision": str(version),
+    }
+    if _not_modified(request, etag, modified):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
+
+def _json_response(request, headers, entry):
+    body, next_cursor = entry
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return Response(body, media_type="application/json", headers=headers)
+
+def _cached_json(request, db, key, build):
+    """Serve ``build()`` -> (body bytes, next cursor) through the catalog cache.
+
+    Responses carry an ETag/Last-Modified of the catalog version, and a
+    matching If-None-Match/If-Modified-Since gets a 304 without touching
+    the catalog at all.
+    """
+    version, modified = crud.get_catalog_version(db)
+    headers, not_modified = _conditional(request, version, modified, key)
+    if not_modified is not None:
+        return not_modified
+    entry = catalog_cache.get((version, key))
+    if entry is None:
+        entry = build()
+        catalog_cache.put((version, key), entry)
+    return _json_response(request, headers, entry)
+
+async def _cached_json_async(request, db, key, build):
+    """_cached_json for an AsyncSession; ``build`` is a coroutine function."""
+    version, modified = await crud.get_catalog_version_async(db)
+    headers, not_modified = _conditional(request, version, modified, key)
+    if not_modified is not None:
+        return not_modified
+    entry = catalog_cache.get((version, key))
+    if entry is None:
+        entry = await build()
+        catalog_cache.put((version, key), entry)
+    return _json_response(request, headers, entry)
+
+def _dump(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+MAX_PAGE_SIZE = int(os.environ.get("DVA_CATALOG_MAX_PAGE_SIZE", "1000"))
+
+def _split(value):
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+def _encode_cursor(sort, key):
+    raw = json.dumps({"sort": sort, "key": list(key)}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor, sort):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        sort_value, vuln_id = data["key"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("sort") != sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    return sort_value, vuln_id
+
+def _fields(fields):
+    selected = _split(fields) or list(crud.VULNERABILITY_FIELDS)
+    unknown = [name for name in selected if name not in crud.VULNERABILITY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    if "id" not in selected:
+        selected.insert(0, "id")
+    return list(dict.fromkeys(selected))
+
+def _list_params(
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,title,severity"),
+    sort: str = Query("id", description="id, title or severity; prefix with - for descending"),
+    severity: Optional[str] = Query(None, description="Comma-separated severities to keep"),
+    q: Optional[str] = Query(None, description="Case-insensitive title substring"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+):
+    """Validated list parameters: (cache key, crud.list_vulnerabilities kwargs, sort)."""
+    fields_list = _fields(fields)
+    sort_name = sort.lstrip("-")
+    if sort_name not in crud.VULNERABILITY_SORTS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort_name}; use {', '.join(crud.VULNERABILITY_SORTS)}")
+    after = _decode_cursor(cursor, sort) if cursor else None
+    severities = _split(severity)
+
+    key = ("list", tuple(fields_list), sort, tuple(severities), q, cursor, limit)
+    options = {
+        "fields": fields_list,
+        "sort": sort_name,
+        "descending": sort.startswith("-"),
+        "severities": severities,
+        "search": q,
+        "after": after,
+        "limit": limit,
+    }
+    return key, options, sort
+
+def _list_entry(page, sort):
+    rows, next_key = page
+    # Rows are already plain dicts of the selected columns; skip re-validating them.
+    return _dump(rows), (_encode_cursor(sort, next_key) if next_key is not None else None)
+
+# Without parameters this is the full catalog, as before. With ?limit= the
+# next page's cursor comes back in X-Next-Cursor (and a Link: rel="next").
+def read_vulnerabilities(request: Request, params=Depends(_list_params), db: Session = Depends(get_db)):
+    key, options, sort = params
+
+    def build():
+        return _list_entry(crud.list_vulnerabilities(db, **options), sort)
+
+    return _cached_json(request, db, key, build)
+
+async def read_vulnerabilities_async(request: Request, params=Depends(_list_params), db=Depends(get_async_db)):
+    key, options, sort = params
+
+    async def build():
+        return _list_entry(await crud.list_vulnerabilities_async(db, **options), sort)
+
+    return await _cached_json_async(request, db, key, build)
 
-@router.get("/{vuln_id}", response_model=schemas.Vulnerability)
-def read_vulnerability(vuln_id: int, db: Session = Depends(get_db)):
-    vuln = crud.get_vulnerability(db, vuln_id)
+_read_route(
+    "/", read_vulnerabilities, read_vulnerabilities_async,
+    response_model=list[schemas.VulnerabilityFields], response_model_exclude_unset=True
+)
+
+def _search_params(
+    q: str = Query(..., min_length=1, description="Words to find; a trailing * (or the last word) matches prefixes"),
+    limit: int = Query(20, ge=1, le=200),
+    prefix: bool = Query(True, description="Treat the last word as a prefix (search as you type)"),
+):
+    return q, limit, prefix
+
+# Registered before /{vuln_id} so "search" isn't parsed as an id.
+def search_vulnerabilities(request: Request, params=Depends(_search_params), db: Session = Depends(get_db)):
+    def build():
+        return _dump(search.search_vulnerabilities(db, *params)), None
+
+    return _cached_json(request, db, ("search", *params), build)
+
+async def search_vulnerabilities_async(request: Request, params=Depends(_search_params), db=Depends(get_async_db)):
+    async def build():
+        return _dump(await search.search_vulnerabilities_async(db, *params)), None
+
+    return await _cached_json_async(request, db, ("search", *params), build)
+
+_read_route("/search", search_vulnerabilities, search_vulnerabilities_async)
+
+def _changes_params(
+    since: int = Query(..., ge=0, description="X-Catalog-Revision of the last load, or revision of the last /changes"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,title,severity"),
+):
+    return since, _fields(fields)
+
+def _changes_entry(changes, since):
+    if since > changes["revision"]:
+        # A revision from another (or a reset) catalog; the client has to reload.
+        raise HTTPException(status_code=410, detail="Unknown catalog revision; reload the catalog")
+    return _dump(changes), None
+
+# Registered before /{vuln_id} so "changes" isn't parsed as an id.
+def read_changes(request: Request, params=Depends(_changes_params), db: Session = Depends(get_db)):
+    since, fields_list = params
+
+    def build():
+        return _changes_entry(crud.get_changes(db, since, fields_list), since)
+
+    return _cached_json(request, db, ("changes", since, tuple(fields_list)), build)
+
+async def read_changes_async(request: Request, params=Depends(_changes_params), db=Depends(get_async_db)):
+    since, fields_list = params
+
+    async def build():
+        return _changes_entry(await crud.get_changes_async(db, since, fields_list), since)
+
+    return await _cached_json_async(request, db, ("changes", since, tuple(fields_list)), build)
+
+_read_route(
+    "/changes", read_changes, read_changes_async,
+    response_model=schemas.CatalogChanges, response_model_exclude_unset=True
+)
+
+@router.post("/batch")
+def batch_vulnerabilities(batch: schemas.BatchRequest, db: Session = Depends(get_db)):
+    # Mixed create/update/delete in one transaction, see webapp.catalog_batch.
+    try:
+        results = catalog_batch.apply_batch(db, batch.operations)
+    except catalog_batch.BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail={"message": str(e), "results": e.results})
+    _catalog_changed()
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "updated", "deleted")}
+    return {**counts, "results": results}
+
+@router.get("/export")
+def export_vulnerabilities(format: str = Query("xlsx", description="xlsx, csv or jsonl")):
+    # Same columns as upload_excel accepts; streamed, see webapp.catalog_export.
+    fmt = format.lower()
+    if fmt not in catalog_export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format {format}; use xlsx, csv or jsonl")
+    return StreamingResponse(
+        catalog_export.iter_catalog_export(fmt),
+        media_type=catalog_export.EXPORT_FORMATS[fmt][1],
+        headers={"Content-Disposition": f'attachment; filename="{catalog_export.export_filename(fmt)}"'}
+    )
+
+def _item_entry(vuln):
     if vuln is None:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
-    return vuln
+    return schemas.Vulnerability.model_validate(vuln).model_dump_json().encode("utf-8"), None
+
+def read_vulnerability(vuln_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        return _item_entry(crud.get_vulnerability(db, vuln_id))
+
+    return _cached_json(request, db, ("item", vuln_id), build)
+
+async def read_vulnerability_async(vuln_id: int, request: Request, db=Depends(get_async_db)):
+    async def build():
+        return _item_entry(await crud.get_vulnerability_async(db, vuln_id))
+
+    return await _cached_json_async(request, db, ("item", vuln_id), build)
+
+_read_route("/{vuln_id}", read_vulnerability, read_vulnerability_async, response_model=schemas.Vulnerability)
 
 @router.post("/", response_model=schemas.Vulnerability)
 def create_vulnerability(vuln: schemas.VulnerabilityCreate, db: Session = Depends(get_db)):
-    return crud.create_vulnerability(db, vuln)
+    db_vuln = crud.create_vulnerability(db, vuln)
+    _catalog_changed()
+    return db_vuln
 
 @router.put("/{vuln_id}/", response_model=schemas.Vulnerability)
 def update_vulnerability(vuln_id: int, updated: schemas.VulnerabilityCreate, db: Session = Depends(get_db)):
@@ -38,10 +304,12 @@ def update_vulnerability(vuln_id: int, updated: schemas.VulnerabilityCreate, db:
     if not vuln:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
 
+    crud.bump_catalog_version(db)
     for field, value in updated.dict().items():
         setattr(vuln, field, value)
 
     db.commit()
+    _catalog_changed()
     db.refresh(vuln)
     return vuln
 
@@ -50,87 +318,32 @@ def delete_vulnerability(vuln_id: int, db: Session = Depends(get_db)):
     vuln = db.query(models.Vulnerability).filter(models.Vulnerability.id == vuln_id).first()
     if not vuln:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
+    crud.bump_catalog_version(db)
+    crud.record_deletions(db, [vuln_id])
     db.delete(vuln)
     db.commit()
+    _catalog_changed()
     return {"message": "Deleted successfully"}
 
 
 @router.post("/upload_excel/")
-async def upload_vulnerabilities(file: UploadFile = File(...), db: Session = Depends(get_db)):
+def upload_vulnerabilities(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    # A sync route on purpose: FastAPI runs it on the threadpool, so large
+    # imports don't stall the event loop. See webapp.catalog_import.
     try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-
-        required_columns = ['title', 'severity', 'description', 'recommendation', 'reference']
-        for col in required_columns:
-            if col not in df.columns:
-                raise HTTPException(status_code=400, detail=f"Missing column: {col}")
-
-        inserted = 0
-        updated = 0
-        skipped = 0
-
-        for idx, row in df.iterrows():
-            try:
-                title = str(row["title"]).strip()
-                severity = str(row["severity"]).strip()
-                description = str(row.get("description", "")).strip()
-                recommendation = str(row.get("recommendation", "")).strip()
-                reference = str(row.get("reference", "")).strip()
-
-                if not title or not severity:
-                    skipped += 1
-                    continue
-
-                existing = db.query(models.Vulnerability).filter(
-                    models.Vulnerability.title.ilike(title)
-                ).first()
-
-                if existing:
-                    if (
-                        existing.severity != severity or
-                        existing.description != description or
-                        existing.recommendation != recommendation or
-                        existing.reference != reference
-                    ):
-                        existing.severity = severity
-                        existing.description = description
-                        existing.recommendation = recommendation
-                        existing.reference = reference
-                        db.add(existing)
-                        updated += 1
-                    else:
-                        skipped += 1
-                else:
-                    vuln = models.Vulnerability(
-                        title=title,
-                        severity=severity,
-                        cvss_score="",
-                        cvss_vector="",
-                        description=description,
-                        evidence="",
-                        recommendation=recommendation,
-                        reference=reference
-                    )
-                    db.add(vuln)
-                    inserted += 1
-
-            except Exception as row_error:
-                print(f"❌ Error processing row {idx}: {row_error}")
-                skipped += 1
-
-        db.commit()
-        return {
-            "inserted": inserted,
-            "updated": updated,
-            "skipped": skipped,
-            "message": f"✅ Upload complete. Inserted: {inserted}, Updated: {updated}, Skipped: {skipped}"
-        }
-
+        result = catalog_import.import_catalog(db, file.file)
+    except catalog_import.SheetFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         print("Upload Excel Error:", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"❌ Error processing file: {str(e)}")
+    finally:
+        _catalog_changed()
+
+    stats = result["stats"]
+    print(f"📥 Catalog import: {stats['rows']} rows in {stats['seconds']}s ({stats['rows_per_second']} rows/s)")
+    return result
 
 
 @router.get("/sample_excel/")
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Literal, Optional
 
 
 class VulnerabilityBase(BaseModel):
@@ -19,3 +20,40 @@ class Vulnerability(VulnerabilityBase):
 
     class Config:
         from_attributes = True  # Updated for Pydantic v2+
+
+class VulnerabilityFields(BaseModel):
+    # A catalog row projected with ?fields=: id plus only the requested columns.
+    id: int
+    title: Optional[str] = None
+    severity: Optional[str] = None
+    cvss_score: Optional[str] = None
+    cvss_vector: Optional[str] = None
+    description: Optional[str] = None
+    evidence: Optional[str] = None
+    recommendation: Optional[str] = None
+    reference: Optional[str] = None
+
+class CatalogChanges(BaseModel):
+    # Apply ``deleted``, then upsert ``changed``; continue with since=revision.
+    revision: int
+    changed: list[VulnerabilityFields]
+    deleted: list[int]
+
+class VulnerabilityUpdate(BaseModel):
+    # Partial update: only the fields that are sent (and not null) change.
+    title: Optional[str] = None
+    severity: Optional[str] = None
+    cvss_score: Optional[str] = None
+    cvss_vector: Optional[str] = None
+    description: Optional[str] = None
+    evidence: Optional[str] = None
+    recommendation: Optional[str] = None
+    reference: Optional[str] = None
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    data: Optional[dict] = None
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
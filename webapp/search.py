@@ -0,0 +1,163 @@
+"""Full-text search over the vulnerability catalog (SQLite FTS5).
+
+``vulnerabilities_fts`` is an external-content FTS5 index over title,
+description, recommendation and reference. Triggers keep it in sync with
+the ``vulnerabilities`` table, so no write path has to know about it. On
+other databases, or SQLite builds without FTS5, search falls back to a
+title substring match.
+"""
+import html
+import re
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+FTS_TABLE = "vulnerabilities_fts"
+FTS_COLUMNS = ("title", "description", "recommendation", "reference")
+# bm25() weights per column: a hit in the title counts most.
+FTS_WEIGHTS = (10.0, 2.0, 1.0, 1.0)
+
+# Snippets are marked with control characters, then HTML-escaped, so they
+# can be rendered as HTML without trusting catalog text.
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+# Set by ensure_search_index (webapp.database.init_db).
+fts_enabled = False
+
+
+def _ddl():
+    cols = ", ".join(FTS_COLUMNS)
+    new = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({cols}, content='vulnerabilities', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON vulnerabilities BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON vulnerabilities BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {cols} ON vulnerabilities BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new}); END",
+        # Index whatever the catalog already holds.
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+def ensure_search_index(engine):
+    """Create the FTS5 index and its triggers if missing; False if unsupported."""
+    global fts_enabled
+    fts_enabled = _ensure_fts(engine)
+    return fts_enabled
+
+
+def _ensure_fts(engine):
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        if exists:
+            return True
+        try:
+            for statement in _ddl():
+                conn.execute(text(statement))
+        except OperationalError as e:
+            # SQLite compiled without FTS5 ("no such module: fts5").
+            if "fts5" not in str(e).lower():
+                raise
+            print(f"⚠️ Full-text search unavailable, using title matching: {e}")
+            return False
+    print("🔎 Built the vulnerability search index")
+    return True
+
+
+def match_query(q, prefix=True):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must match. Words ending in ``*`` are prefix searches, and
+    so is the last word when ``prefix`` is set (search-as-you-type).
+    Operators and quotes typed by the user are not interpreted.
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        return None
+    parts = []
+    for i, term in enumerate(terms):
+        word = term.rstrip("*")
+        star = term.endswith("*") or (prefix and i == len(terms) - 1)
+        parts.append(f'"{word}"' + ("*" if star else ""))
+    return " ".join(parts)
+
+
+def _marked_html(value):
+    return (
+        html.escape(value or "")
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+def _search_statement(expression, limit):
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    return text(
+        f"SELECT v.id, v.title, v.severity, bm25({FTS_TABLE}, {weights}) AS rank, "
+        f"highlight({FTS_TABLE}, 0, :start, :end) AS title_marked, "
+        f"snippet({FTS_TABLE}, -1, :start, :end, '…', 16) AS snippet_marked "
+        f"FROM {FTS_TABLE} JOIN vulnerabilities v ON v.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :expression ORDER BY rank LIMIT :limit"
+    ).bindparams(expression=expression, start=_MARK_START, end=_MARK_END, limit=limit)
+
+
+def _fallback_options(q, limit):
+    return {"fields": ["id", "title", "severity"], "search": q.strip().rstrip("*"), "limit": limit}
+
+
+def _fallback_hits(rows):
+    return [dict(row, rank=None, title_html=html.escape(row["title"] or ""), snippet_html="") for row in rows]
+
+
+def _hits(rows):
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "severity": row.severity,
+            "rank": row.rank,
+            "title_html": _marked_html(row.title_marked),
+            "snippet_html": _marked_html(row.snippet_marked),
+        }
+        for row in rows
+    ]
+
+
+def search_vulnerabilities(db, q, limit=20, prefix=True, fts=None):
+    """BM25-ranked catalog hits for ``q``, best first.
+
+    Each hit has id, title, severity, rank (lower is better), and
+    ``title_html``/``snippet_html`` with the matches wrapped in <mark>.
+    """
+    expression = match_query(q, prefix)
+    if expression is None:
+        return []
+    if not (fts_enabled if fts is None else fts):
+        from webapp import crud
+        rows, _ = crud.list_vulnerabilities(db, **_fallback_options(q, limit))
+        return _fallback_hits(rows)
+    return _hits(db.execute(_search_statement(expression, limit)))
+
+
+async def search_vulnerabilities_async(db, q, limit=20, prefix=True, fts=None):
+    """search_vulnerabilities on an AsyncSession."""
+    expression = match_query(q, prefix)
+    if expression is None:
+        return []
+    if not (fts_enabled if fts is None else fts):
+        from webapp import crud
+        rows, _ = await crud.list_vulnerabilities_async(db, **_fallback_options(q, limit))
+        return _fallback_hits(rows)
+    return _hits(await db.execute(_search_statement(expression, limit)))
@@ -0,0 +1,177 @@
+"""Stage timers and on-demand profiling for report rendering.
+
+A ``StageTimer`` is threaded through the report pipeline. Sequential phases
+(cover, chart, summary, images, findings, saving) are recorded with
+``mark()``; hot calls inside a phase (``add_picture``, fragment cache
+lookups) are accumulated with ``measure()``. The result is returned as a
+``Server-Timing`` header and printed as one JSON log line per report.
+
+With DVA_PROFILING=true, requests can ask for a profile (``?profile=1``
+or ``X-DVA-Profile: 1``); it is off by default so clients can't make the
+server write profiles. Profiles are written as cProfile ``.prof`` files
+under DVA_PROFILE_DIR, keeping the newest DVA_PROFILE_KEEP. Only one
+request is profiled at a time; cProfile sees the calling thread only, so
+work done in the image thread pool shows up as time spent waiting on it.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+PROFILING_ENABLED = os.environ.get("DVA_PROFILING", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("DVA_PROFILE_DIR", os.path.join("generated_reports", "profiles"))
+PROFILE_KEEP = int(os.environ.get("DVA_PROFILE_KEEP", "20"))
+
+_profile_lock = threading.Lock()
+
+
+class StageTimer:
+    def __init__(self, kind="report"):
+        self.kind = kind
+        self.id = uuid.uuid4().hex[:12]
+        self.phases = {}
+        self.measures = {}
+        self.counts = {}
+        self.children = {}
+        self._started = time.perf_counter()
+        self._phase = None
+        self._phase_started = None
+        self._stopped = None
+
+    def mark(self, phase):
+        """End the current phase (if any) and start ``phase``."""
+        if phase == self._phase:
+            return
+        now = time.perf_counter()
+        self._close_phase(now)
+        self._phase, self._phase_started = phase, now
+
+    def _close_phase(self, now):
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._phase_started
+            self._phase = None
+
+    @contextmanager
+    def measure(self, name):
+        """Accumulate time spent inside the block under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.measures[name] = self.measures.get(name, 0.0) + time.perf_counter() - start
+            self.count(name)
+
+    def add_child(self, name, timer):
+        """Attach the timer of a sub-task (e.g. one output format rendered concurrently)."""
+        self.children[name] = timer
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def stop(self):
+        if self._stopped is None:
+            self._stopped = time.perf_counter()
+            self._close_phase(self._stopped)
+        return self
+
+    @property
+    def total(self):
+        return (self._stopped or time.perf_counter()) - self._started
+
+    def as_dict(self):
+        """Seconds per phase and measure, plus counters."""
+        return {
+            "total": round(self.total, 4),
+            "phases": {k: round(v, 4) for k, v in self.phases.items()},
+            "measures": {k: round(v, 4) for k, v in self.measures.items()},
+            "counts": dict(self.counts),
+            **({"children": {k: t.as_dict() for k, t in self.children.items()}} if self.children else {}),
+        }
+
+    def server_timing(self):
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        entries += [
+            f'{name};dur={seconds * 1000:.1f};desc="{self.counts.get(name, 0)} calls"'
+            for name, seconds in self.measures.items()
+        ]
+        for prefix, child in self.children.items():
+            entries += [f"{prefix}-{name};dur={seconds * 1000:.1f}" for name, seconds in child.phases.items()]
+            entries.append(f"{prefix}-total;dur={child.total * 1000:.1f}")
+        entries.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def log(self, **fields):
+        record = dict({"event": f"{self.kind}_timing", "id": self.id}, **fields, **self.as_dict())
+        print(f"⏱️ {json.dumps(record)}", flush=True)
+
+
+def profile_requested(query_flag=False, header_value=None):
+    return bool(query_flag) or (header_value or "").strip().lower() in ("1", "true", "yes")
+
+
+class RequestProfile:
+    def __init__(self, label):
+        self.label = label
+        self.path = None
+        self.skipped = None
+
+
+def _prune_profiles():
+    files = sorted(
+        (os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR) if f.endswith(".prof")),
+        key=os.path.getmtime
+    )
+    for path in files[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def maybe_profile(enabled, label):
+    """Run the block under cProfile when ``enabled``; yields a RequestProfile."""
+    result = RequestProfile(label)
+    if not enabled:
+        yield result
+        return
+    if not PROFILING_ENABLED:
+        result.skipped = "profiling disabled"
+        yield result
+        return
+    if not _profile_lock.acquire(blocking=False):
+        result.skipped = "another request is being profiled"
+        yield result
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            result.path = os.path.join(PROFILE_DIR, f"{safe_label}_{stamp}_{uuid.uuid4().hex[:8]}.prof")
+            profiler.dump_stats(result.path)
+            _prune_profiles()
+            print(f"🔬 Profile written to {result.path}")
+    finally:
+        _profile_lock.release()
+
+
+def timing_headers(timer, profile=None):
+    headers = {"Server-Timing": timer.server_timing(), "X-DVA-Timing-Id": timer.id}
+    if profile is not None and profile.path:
+        headers["X-DVA-Profile"] = os.path.basename(profile.path)
+    elif profile is not None and profile.skipped:
+        headers["X-DVA-Profile"] = f"skipped: {profile.skipped}"
+    return headers
@@ -0,0 +1,150 @@
+"""Startup profiling and warm-up of the lazily imported rendering stacks.
+
+The report (python-docx, PIL, matplotlib) and Excel (openpyxl)
+stacks are imported on first use. ``start_warmup`` pre-initializes them
+on a background thread after the app is up, so containers become ready
+quickly and the first real report doesn't hit the cold path.
+
+Configuration:
+    DVA_WARMUP        background (default) | blocking | off
+    DVA_WARMUP_TASKS  comma separated subset of WARMUP_TASKS (default: all)
+
+Run ``python -m webapp.warmup`` for an import-time breakdown of
+``webapp.main``.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+WARMUP_MODE = os.environ.get("DVA_WARMUP", "background").lower()
+
+# Populated as tasks finish: {task_name: seconds or error string}
+warmup_status = {}
+_warmup_done = threading.Event()
+
+
+def _warm_charts():
+    from webapp.charts import render_severity_chart
+    # First render builds matplotlib's font cache and Agg text layout.
+    render_severity_chart((1, 1, 1, 1))
+
+
+def _warm_docx():
+    from io import BytesIO
+    from PIL import Image as PILImage
+    from webapp.report_templates import get_template
+
+    # Compiles the built-in report skeleton (python-docx default template,
+    # logo, styles) and exercises the XML/image machinery once.
+    doc = get_template().render({})
+    doc.add_paragraph("warm-up")
+    doc.save(BytesIO())
+    PILImage.init()
+
+
+def _warm_excel():
+    import openpyxl  # noqa: F401
+
+
+WARMUP_TASKS = {
+    "charts": _warm_charts,
+    "docx": _warm_docx,
+    "excel": _warm_excel,
+}
+
+
+def _selected_tasks():
+    names = os.environ.get("DVA_WARMUP_TASKS")
+    if not names:
+        return list(WARMUP_TASKS)
+    return [n.strip() for n in names.split(",") if n.strip() in WARMUP_TASKS]
+
+
+def run_warmup():
+    for name in _selected_tasks():
+        start = time.perf_counter()
+        try:
+            WARMUP_TASKS[name]()
+            warmup_status[name] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            warmup_status[name] = f"failed: {e}"
+            print(f"⚠️ Warm-up task {name} failed: {e}")
+    _warmup_done.set()
+    print(f"🔥 Warm-up finished: {warmup_status}")
+
+
+def start_warmup(mode=None):
+    mode = (mode or WARMUP_MODE).lower()
+    if mode in ("off", "0", "false", "no"):
+        _warmup_done.set()
+        return
+    if mode == "blocking":
+        run_warmup()
+        return
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+
+def is_warm():
+    return _warmup_done.is_set()
+
+
+def import_profile(module="webapp.main"):
+    """Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Returns ``(total_us, packages, app_modules)``: self time summed per
+    top-level package (so the numbers add up to the total), and the
+    cumulative time of each ``webapp.*`` module, both sorted by cost.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    packages = defaultdict(int)
+    app_modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # header line
+        name = name.strip()
+        packages[name.split(".")[0]] += self_us
+        if name.startswith("webapp."):
+            app_modules[name] = cumulative_us
+
+    total = sum(packages.values())
+    by_cost = lambda kv: kv[1]
+    return (
+        total,
+        sorted(packages.items(), key=by_cost, reverse=True),
+        sorted(app_modules.items(), key=by_cost, reverse=True),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show an import-time breakdown of the API.")
+    parser.add_argument("module", nargs="?", default="webapp.main")
+    parser.add_argument("-n", "--top", type=int, default=15)
+    args = parser.parse_args()
+
+    total, packages, app_modules = import_profile(args.module)
+    print(f"Import of {args.module}: {total / 1000:.1f} ms")
+    print("By package (self time):")
+    for name, us in packages[:args.top]:
+        print(f"  {name:<30} {us / 1000:>9.1f} ms  {100 * us / total:5.1f}%")
+    print("App modules (cumulative):")
+    for name, us in app_modules[:args.top]:
+        print(f"  {name:<30} {us / 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
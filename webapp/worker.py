@@ -0,0 +1,135 @@
+"""Report rendering worker.
+
+Run one or more of these next to the API (``python -m webapp.worker``).
+Workers poll the shared SQLite job queue in ``webapp.jobs`` and render
+queued reports into ``generated_reports/``.
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from webapp import jobs
+from webapp.artifacts import artifact_store
+
+POLL_INTERVAL = float(os.environ.get("DVA_WORKER_POLL_SECONDS", "1.0"))
+
+
+class _Heartbeat:
+    """Renews the job's lease every HEARTBEAT_SECONDS for as long as it runs.
+
+    Progress callbacks alone aren't enough: the image pass or saving a big
+    document can outlast the lease. ``lost`` is set once the lease is gone.
+    """
+
+    def __init__(self, job_id, worker_id):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(jobs.HEARTBEAT_SECONDS):
+            try:
+                alive = jobs.heartbeat(self.job_id, self.worker_id)
+            except Exception as e:
+                # e.g. the jobs db is busy; the next beat retries within the lease.
+                print(f"⚠️ Heartbeat for job {self.job_id} failed: {e}")
+                continue
+            if not alive:
+                self.lost.set()
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_job(job):
+    # Imported here so the queue/CLI plumbing stays cheap to start.
+    from webapp.routers.report import ReportRequest, render_report
+    from webapp.timing import StageTimer
+
+    job_id = job["id"]
+    worker_id = job["worker_id"]
+    _, filepath = artifact_store.new_path("report", ".docx", key=job_id)
+    # Rendered under a private name and moved into place, so a worker that
+    # lost its lease can never interleave writes with the one that took over.
+    partial = f"{filepath}.{uuid.uuid4().hex}.part"
+
+    timer = StageTimer("report_job")
+    with _Heartbeat(job_id, worker_id) as beat:
+        def progress(stage, fraction):
+            if beat.lost.is_set():
+                raise jobs.LeaseLost(job_id)
+            jobs.update_progress(job_id, worker_id, stage, round(fraction, 3))
+
+        try:
+            payload = ReportRequest(**job["payload"])
+            render_report(payload, partial, progress, timer)
+            if beat.lost.is_set():
+                raise jobs.LeaseLost(job_id)
+            os.replace(partial, filepath)
+        except jobs.LeaseLost:
+            print(f"⚠️ Lost the lease on job {job_id}; another worker has it now")
+            return False
+        except Exception as e:
+            print(f"❌ Report job {job_id} failed:", traceback.format_exc())
+            if not jobs.fail_job(job_id, worker_id, str(e)):
+                print(f"⚠️ Job {job_id} was taken over; not marking it failed")
+            return False
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        timer.log(job_id=job_id, findings=len(payload.vulnerabilities), output_bytes=os.path.getsize(filepath))
+        if not jobs.complete_job(job_id, worker_id, filepath):
+            print(f"⚠️ Job {job_id} was taken over before it completed here")
+            return False
+    return True
+
+
+def work_forever(worker_id=None, poll_interval=POLL_INTERVAL):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    jobs.init_jobs_db()
+    print(f"👷 Report worker {worker_id} started")
+    while True:
+        job = jobs.claim_next_job(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        print(f"▶️ {worker_id} rendering job {job['id']} (attempt {job['attempts'] + 1})")
+        run_job(job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render queued DVA report jobs.")
+    parser.add_argument(
+        "-p", "--processes", type=int,
+        default=int(os.environ.get("DVA_WORKER_PROCESSES", "1")),
+        help="number of worker processes to run in this container"
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        work_forever()
+        return
+
+    procs = [multiprocessing.Process(target=work_forever, daemon=True) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()